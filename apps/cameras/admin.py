@@ -15,7 +15,10 @@ class CameraAdmin(admin.ModelAdmin):
             'fields': ('stream_url', 'rtsp_url')
         }),
         ('Configuração de Detecção', {
-            'fields': ('detection_class', 'detection_class_name', 'model_config')
+            'fields': ('detection_class', 'detection_class_name', 'detection_classes', 'model_config', 'use_quantized_model')
+        }),
+        ('Preview', {
+            'fields': ('preview_max_width', 'preview_jpeg_quality', 'preview_fps')
         }),
     )
     
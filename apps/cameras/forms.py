@@ -5,16 +5,29 @@ from apps.configuracao.models import ModelConfiguration
 
 
 class CameraForm(forms.ModelForm):
+    detection_classes = forms.TypedMultipleChoiceField(
+        choices=Camera.YOLO_CLASSES,
+        coerce=int,
+        required=False,
+        label="Classes Adicionais",
+        widget=forms.SelectMultiple(attrs={"class": "form-control", "size": 6}),
+    )
+
     class Meta:
         model = Camera
-        fields = ["name", "rtsp_url", "stream_url", "location", "model_config", "detection_class", "is_active"]
+        fields = ["name", "rtsp_url", "stream_url", "location", "model_config", "use_quantized_model", "detection_class", "detection_classes",
+                  "preview_max_width", "preview_jpeg_quality", "preview_fps", "is_active"]
         labels = {
             "name": "Nome da Câmera",
             "rtsp_url": "URL RTSP",
             "stream_url": "URL HTTP/MJPEG",
             "location": "Localização",
             "model_config": "Modelo .pt",
+            "use_quantized_model": "Usar modelo INT8",
             "detection_class": "Classe para Detectar",
+            "preview_max_width": "Largura Máx. do Preview",
+            "preview_jpeg_quality": "Qualidade JPEG do Preview",
+            "preview_fps": "FPS do Preview",
             "is_active": "Ativa",
         }
         widgets = {
@@ -23,7 +36,11 @@ class CameraForm(forms.ModelForm):
             "stream_url": forms.URLInput(attrs={"class": "form-control", "placeholder": "http://ip:porta/mjpg/video.mjpg"}),
             "location": forms.TextInput(attrs={"class": "form-control"}),
             "model_config": forms.Select(attrs={"class": "form-control"}),
+            "use_quantized_model": forms.CheckboxInput(attrs={"class": "form-check-input"}),
             "detection_class": forms.Select(attrs={"class": "form-control"}),
+            "preview_max_width": forms.NumberInput(attrs={"class": "form-control", "min": 0, "step": 16}),
+            "preview_jpeg_quality": forms.NumberInput(attrs={"class": "form-control", "min": 1, "max": 100}),
+            "preview_fps": forms.NumberInput(attrs={"class": "form-control", "min": 1, "step": 1}),
             "is_active": forms.CheckboxInput(attrs={"class": "form-check-input"}),
         }
     
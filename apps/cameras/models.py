@@ -24,6 +24,26 @@ class Camera(models.Model):
         help_text="Modelo .pt associado à câmera"
     )
     
+    # Usar variante INT8 do modelo (se já quantizado) na contagem
+    use_quantized_model = models.BooleanField(
+        default=False,
+        help_text="Usa a versão INT8 do modelo (mais rápida em CPU, pequena perda de acurácia)"
+    )
+    
+    # Perfil do preview MJPEG (links 4G: menor resolução/qualidade/FPS)
+    preview_max_width = models.PositiveIntegerField(
+        default=960,
+        help_text="Largura máxima do preview em pixels (0 = resolução original)"
+    )
+    preview_jpeg_quality = models.PositiveSmallIntegerField(
+        default=75,
+        help_text="Qualidade JPEG do preview (1-100)"
+    )
+    preview_fps = models.FloatField(
+        default=10.0,
+        help_text="FPS máximo do preview"
+    )
+    
     # Classes YOLO disponíveis
     YOLO_CLASSES = [
         (0, 'person'),
@@ -121,6 +141,13 @@ class Camera(models.Model):
         blank=True,
         help_text="Nome da classe YOLO selecionada"
     )
+    
+    # Classes adicionais contadas na mesma passada do detector (ex: pessoas + porcos)
+    detection_classes = models.JSONField(
+        default=list,
+        blank=True,
+        help_text="Outras classes YOLO contadas junto com a principal (contagem por classe)"
+    )
 
     class Meta:
         db_table = "cameras"
@@ -136,6 +163,17 @@ class Camera(models.Model):
         # Validar formato HTTP para MJPEG
         if self.stream_url and not (self.stream_url.startswith('http://') or self.stream_url.startswith('https://')):
             raise ValidationError("URL de stream deve começar com 'http://' ou 'https://'")
+        
+        if not 1 <= self.preview_jpeg_quality <= 100:
+            raise ValidationError("Qualidade JPEG do preview deve estar entre 1 e 100")
+        if self.preview_fps <= 0:
+            raise ValidationError("FPS do preview deve ser maior que zero")
+
+    @property
+    def counting_classes(self):
+        """Classes enviadas ao detector: a principal + as adicionais, sem repetição."""
+        classes = [self.detection_class] + [int(c) for c in (self.detection_classes or [])]
+        return sorted(set(classes))
 
     @property
     def primary_url(self):
@@ -9,8 +9,9 @@ class ModelConfigurationAdmin(admin.ModelAdmin):
     list_display = ('name', 'status_display', 'is_active', 'visibility_display', 'confidence_threshold', 'file_info', 'uploaded_at', 'uploaded_by')
     list_filter = ('is_active', 'is_public', 'uploaded_at', 'confidence_threshold')
     search_fields = ('name',)
-    readonly_fields = ('uploaded_at', 'updated_at', 'file_size', 'uploaded_by', 'file_status')
-    actions = ['delete_missing_files', 'make_public', 'make_private']
+    readonly_fields = ('uploaded_at', 'updated_at', 'file_size', 'uploaded_by', 'file_status', 'onnx_path', 'openvino_path',
+                       'int8_path', 'quantization_report')
+    actions = ['delete_missing_files', 'make_public', 'make_private', 'export_onnx', 'export_openvino', 'quantize_int8']
     
     fieldsets = (
         ('Informações Básicas', {
@@ -23,6 +24,14 @@ class ModelConfigurationAdmin(admin.ModelAdmin):
         ('Configurações', {
             'fields': ('confidence_threshold',)
         }),
+        ('Runtime de Inferência', {
+            'fields': ('runtime_backend', 'onnx_path', 'openvino_path'),
+            'description': 'ONNX/OpenVINO rodam mais rápido em CPU; exporte o modelo pelas ações da lista'
+        }),
+        ('Quantização INT8', {
+            'fields': ('int8_path', 'quantization_report'),
+            'description': 'As câmeras escolhem a variante INT8 em "Usar modelo INT8"'
+        }),
         ('Metadados', {
             'fields': ('file_size', 'uploaded_by', 'uploaded_at', 'updated_at'),
             'classes': ('collapse',)
@@ -112,6 +121,59 @@ class ModelConfigurationAdmin(admin.ModelAdmin):
         self.message_user(request, f'{updated} modelo(s) foi/foram marcado(s) como privado(s).')
     make_private.short_description = 'Tornar privado'
     
+    def _export(self, request, queryset, backend):
+        # exportação leva minutos: roda em segundo plano, o caminho aparece no modelo ao terminar
+        from apps.video_ao_vivo.services.contador.export import export_model_async
+        started = 0
+        for obj in queryset:
+            if export_model_async(obj, backends=(backend,)) is None:
+                self.message_user(request, f'{obj.name}: exportação não iniciada (dependências de {backend} ausentes ou exportação em andamento).', level='warning')
+            else:
+                started += 1
+        self.message_user(request, f'Exportação para {backend} iniciada em segundo plano para {started} modelo(s).')
+    
+    def export_onnx(self, request, queryset):
+        """Action para exportar modelos para ONNX"""
+        self._export(request, queryset, 'onnx')
+    export_onnx.short_description = 'Exportar para ONNX'
+    
+    def export_openvino(self, request, queryset):
+        """Action para exportar modelos para OpenVINO IR"""
+        self._export(request, queryset, 'openvino')
+    export_openvino.short_description = 'Exportar para OpenVINO'
+    
+    def quantization_report(self, obj):
+        """Diferença de latência/acurácia entre FP32 e INT8"""
+        if obj.int8_latency_ms is None or obj.fp32_latency_ms is None:
+            return "Sem variante INT8"
+        agreement = (obj.int8_agreement or 0) * 100
+        color = 'green' if agreement >= 95 else 'orange' if agreement >= 85 else 'red'
+        return format_html(
+            '<div>FP32: {} ms &rarr; INT8: {} ms (<strong>{}x</strong>)<br/>'
+            '<span style="color: {};">Concordância das detecções: {}%</span> (perda: {}%)</div>',
+            round(obj.fp32_latency_ms, 1), round(obj.int8_latency_ms, 1), obj.int8_speedup,
+            color, round(agreement, 1), round(100 - agreement, 1)
+        )
+    quantization_report.short_description = 'FP32 x INT8'
+    
+    def quantize_int8(self, request, queryset):
+        """Action para gerar a variante INT8 calibrada com a câmera que usa o modelo"""
+        # calibração + benchmark levam minutos: roda em segundo plano, o relatório
+        # aparece em "FP32 x INT8" ao terminar (ou use `manage.py quantize_model`)
+        from apps.video_ao_vivo.services.contador.quantize import quantize_model_async
+        started = 0
+        for obj in queryset:
+            camera = obj.camera_set.filter(is_active=True).first()
+            if camera is None:
+                self.message_user(request, f'{obj.name}: nenhuma câmera ativa usa este modelo para calibrar.', level='warning')
+                continue
+            if quantize_model_async(obj, camera) is None:
+                self.message_user(request, f'{obj.name}: quantização não iniciada (onnxruntime ausente ou quantização em andamento).', level='warning')
+            else:
+                started += 1
+        self.message_user(request, f'Quantização INT8 iniciada em segundo plano para {started} modelo(s).')
+    quantize_int8.short_description = 'Quantizar INT8 (calibrar com a câmera)'
+    
     def save_model(self, request, obj, form, change):
         if not change:  # Novo objeto
             obj.uploaded_by = request.user
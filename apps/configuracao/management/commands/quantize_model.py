@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+from apps.cameras.models import Camera
+from apps.configuracao.models import ModelConfiguration
+
+
+class Command(BaseCommand):
+    help = 'Gera a variante INT8 de um modelo calibrando com frames de uma câmera'
+
+    def add_arguments(self, parser):
+        parser.add_argument('model_id', type=int, help='ID do ModelConfiguration')
+        parser.add_argument('--camera', type=int, help='ID da câmera usada na calibração (padrão: primeira câmera ativa do modelo)')
+        parser.add_argument('--frames', type=int, default=64, help='Quantidade de frames de calibração')
+
+    def handle(self, *args, **options):
+        from apps.video_ao_vivo.services.contador.quantize import quantize_model
+
+        try:
+            model_config = ModelConfiguration.objects.get(pk=options['model_id'])
+        except ModelConfiguration.DoesNotExist:
+            raise CommandError(f'Modelo {options["model_id"]} não encontrado')
+
+        if options['camera']:
+            camera = Camera.objects.filter(pk=options['camera']).first()
+        else:
+            camera = model_config.camera_set.filter(is_active=True).first()
+        if camera is None:
+            raise CommandError('Nenhuma câmera disponível para calibração')
+
+        self.stdout.write(f'Calibrando {model_config.name} com {options["frames"]} frames de {camera.name}...')
+        report = quantize_model(model_config, camera, num_frames=options['frames'])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'✓ FP32: {report["fp32_latency_ms"]:.1f} ms → INT8: {report["int8_latency_ms"]:.1f} ms '
+                f'({model_config.int8_speedup}x), concordância {report["agreement"] * 100:.1f}%'
+            )
+        )
@@ -2,6 +2,7 @@ from django.db import models
 from django.core.validators import FileExtensionValidator
 from django.conf import settings
 import os
+import shutil
 
 
 def model_upload_path(instance, filename):
@@ -32,6 +33,12 @@ class ModelConfigurationManager(models.Manager):
 class ModelConfiguration(models.Model):
     """Configuração do modelo de IA"""
     
+    RUNTIME_BACKENDS = [
+        ('torch', 'PyTorch (.pt)'),
+        ('onnx', 'ONNX Runtime (CPU)'),
+        ('openvino', 'OpenVINO (CPU)'),
+    ]
+    
     # Manager customizado
     objects = ModelConfigurationManager()
     
@@ -63,6 +70,28 @@ class ModelConfiguration(models.Model):
         help_text="Confiança mínima para detecção (0.0 a 1.0)"
     )
     
+    # Runtime de inferência
+    runtime_backend = models.CharField(
+        max_length=20,
+        choices=RUNTIME_BACKENDS,
+        default='torch',
+        help_text="Runtime usado na inferência (ONNX/OpenVINO exigem exportação prévia)"
+    )
+    
+    # Artefatos exportados (relativos ao MEDIA_ROOT, ao lado do .pt)
+    onnx_path = models.CharField(max_length=500, blank=True, default='')
+    openvino_path = models.CharField(max_length=500, blank=True, default='')
+    
+    # Variante INT8 (quantização pós-treino calibrada com frames da câmera)
+    int8_path = models.CharField(max_length=500, blank=True, default='')
+    fp32_latency_ms = models.FloatField(null=True, blank=True, help_text="Latência média do ONNX FP32 (ms)")
+    int8_latency_ms = models.FloatField(null=True, blank=True, help_text="Latência média do ONNX INT8 (ms)")
+    int8_agreement = models.FloatField(
+        null=True,
+        blank=True,
+        help_text="Fração das detecções FP32 reencontradas pelo INT8 (0.0 a 1.0)"
+    )
+    
     # Timestamps
     uploaded_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -93,8 +122,34 @@ class ModelConfiguration(models.Model):
         if self.model_file:
             if os.path.isfile(self.model_file.path):
                 os.remove(self.model_file.path)
+        # Deleta também os artefatos exportados
+        for path in self.exported_artifacts().values():
+            if os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+            elif os.path.isfile(path):
+                os.remove(path)
         super().delete(*args, **kwargs)
     
+    def exported_artifacts(self):
+        """Retorna {backend: caminho absoluto} dos artefatos exportados"""
+        artifacts = {}
+        for backend, rel_path in (('onnx', self.onnx_path), ('openvino', self.openvino_path), ('onnx-int8', self.int8_path)):
+            if rel_path:
+                artifacts[backend] = os.path.join(settings.MEDIA_ROOT, rel_path)
+        return artifacts
+    
+    def runtime_model_path(self, backend=None, quantized=False):
+        """Retorna (caminho, backend) para inferência, caindo para o .pt se não exportado"""
+        from apps.video_ao_vivo.services.contador.export import resolve_runtime_path
+        return resolve_runtime_path(self.model_file.path, backend or self.runtime_backend, quantized=quantized)
+    
+    @property
+    def int8_speedup(self):
+        """Quantas vezes o INT8 é mais rápido que o FP32 (None sem benchmark)"""
+        if self.fp32_latency_ms and self.int8_latency_ms:
+            return round(self.fp32_latency_ms / self.int8_latency_ms, 2)
+        return None
+    
     @property
     def file_size(self):
         """Retorna o tamanho do arquivo em MB"""
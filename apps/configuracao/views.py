@@ -100,6 +100,9 @@ def model_edit(request, pk):
             
             model.confidence_threshold = float(request.POST.get('confidence_threshold', model.confidence_threshold))
             model.is_public = request.POST.get('is_public') == 'on'
+            backend = request.POST.get('runtime_backend', model.runtime_backend)
+            if backend in dict(ModelConfiguration.RUNTIME_BACKENDS):
+                model.runtime_backend = backend
             
             model.save()
             messages.success(request, f'Modelo "{model.name}" atualizado com sucesso!')
@@ -165,6 +168,10 @@ def upload_model(request):
                 
             model.save()
             
+            # Exporta ONNX/OpenVINO em segundo plano (runtime de CPU)
+            from apps.video_ao_vivo.services.contador.export import export_model_async
+            export_model_async(model)
+            
             status_msg = "ativado" if model.is_active else "enviado"
             messages.success(request, f'Modelo "{model.name}" {status_msg} com sucesso!')
         else:
@@ -55,54 +55,36 @@ def historico(request):
         .order_by('detection_class_name')
     )
     
-    # Dados para gráficos
-    from django.db.models import Sum, Count
-    from datetime import datetime, timedelta
+    # Dados para gráficos - uma consulta nos totais pré-agregados por dia
+    from apps.video_ao_vivo.timebuckets import DAY, last_buckets, rollup_totals
     
-    # Últimos 7 dias do usuário logado
-    last_7_days = datetime.now().date() - timedelta(days=7)
-    recent_sessions = CountingSession.objects.filter(
-        ended_at__isnull=False,
-        started_at__date__gte=last_7_days,
-        user=request.user
-    )
+    # Últimos 7 dias do usuário logado (totais incluem também o 8º dia, como antes)
+    days = rollup_totals(*last_buckets(8, DAY), DAY, user=request.user)
     
     # Totais gerais
-    totals = recent_sessions.aggregate(
-        total_sessions=Count('id'),
-        total_in=Sum('total_in'),
-        total_out=Sum('total_out')
-    )
+    totals = {
+        'total_sessions': sum(day['session_count'] for day in days),
+        'total_in': sum(day['in_count'] for day in days),
+        'total_out': sum(day['out_count'] for day in days),
+    }
     
     # Calcular saldo
-    totals['balance'] = (totals['total_in'] or 0) - (totals['total_out'] or 0)
+    totals['balance'] = totals['total_in'] - totals['total_out']
     
-    # Dados por dia (últimos 7 dias)
-    daily_data = []
+    # Dados por dia (últimos 7 dias, em ordem cronológica)
     weekdays_pt = ['Seg', 'Ter', 'Qua', 'Qui', 'Sex', 'Sáb', 'Dom']
-    
-    for i in range(7):
-        date = datetime.now().date() - timedelta(days=i)
-        day_sessions = recent_sessions.filter(started_at__date=date)
-        daily_totals = day_sessions.aggregate(
-            in_count=Sum('total_in'),
-            out_count=Sum('total_out'),
-            session_count=Count('id')
-        )
-        
-        weekday_pt = weekdays_pt[date.weekday()]
-        
-        daily_data.append({
-            'date': date.strftime('%d/%m'),
-            'full_date': date.strftime('%Y-%m-%d'),
-            'weekday': weekday_pt,
-            'in': daily_totals['in_count'] or 0,
-            'out': daily_totals['out_count'] or 0,
-            'balance': (daily_totals['in_count'] or 0) - (daily_totals['out_count'] or 0),
-            'sessions': daily_totals['session_count'] or 0
-        })
-    
-    daily_data.reverse()  # Ordem cronológica
+    daily_data = [
+        {
+            'date': day['period'].strftime('%d/%m'),
+            'full_date': day['period'].strftime('%Y-%m-%d'),
+            'weekday': weekdays_pt[day['period'].weekday()],
+            'in': day['in_count'],
+            'out': day['out_count'],
+            'balance': day['in_count'] - day['out_count'],
+            'sessions': day['session_count']
+        }
+        for day in days[1:]
+    ]
 
     context = {
         "sessions": sessions_page,
@@ -124,9 +106,9 @@ def log_detail(request, log_id):
     Detalhes de uma sessão de contagem específica
     """
     from django.shortcuts import get_object_or_404
-    import json
     import os
     from django.conf import settings
+    from apps.video_ao_vivo.services.contador.eventlog import read_log
     
     session = get_object_or_404(CountingSession, id=log_id)
     
@@ -136,9 +118,7 @@ def log_detail(request, log_id):
         log_path = os.path.join(settings.MEDIA_ROOT, session.log_file_path)
         if os.path.exists(log_path):
             try:
-                with open(log_path, 'r') as f:
-                    log_data = json.load(f)
-                    events = log_data.get('events', [])
+                events = read_log(log_path)['events']
             except Exception as e:
                 logger.error(f"Erro ao carregar log {log_path}: {e}")
     
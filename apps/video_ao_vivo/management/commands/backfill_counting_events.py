@@ -0,0 +1,72 @@
+import os
+from datetime import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from apps.video_ao_vivo.models import CountingEvent, CountingSession
+
+
+class Command(BaseCommand):
+    help = 'Importa os eventos dos logs de sessão (media/counting_logs) para a tabela CountingEvent'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--session', type=int, help='Importar apenas esta sessão')
+        parser.add_argument('--force', action='store_true', help='Reimportar sessões que já têm eventos no banco')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Eventos por INSERT')
+
+    def handle(self, *args, **options):
+        from apps.video_ao_vivo.services.contador.eventlog import read_log
+
+        sessions = CountingSession.objects.exclude(log_file_path__isnull=True).exclude(log_file_path='')
+        if options['session']:
+            sessions = sessions.filter(pk=options['session'])
+
+        imported_sessions = 0
+        imported_events = 0
+        for session in sessions.order_by('id').iterator():
+            if session.events.exists() and not options['force']:
+                continue
+
+            log_path = os.path.join(settings.MEDIA_ROOT, session.log_file_path)
+            if not os.path.exists(log_path):
+                self.stdout.write(self.style.WARNING(f'Sessão {session.id}: log não encontrado ({log_path})'))
+                continue
+            try:
+                events = read_log(log_path)['events']
+            except Exception as e:
+                self.stdout.write(self.style.ERROR(f'Sessão {session.id}: erro ao ler log: {e}'))
+                continue
+
+            rows = []
+            for event in events:
+                try:
+                    # timestamps dos logs são hora local do servidor, sem fuso
+                    ts = datetime.fromisoformat(event['timestamp'].replace('Z', '+00:00'))
+                except (KeyError, ValueError):
+                    continue
+                if ts.tzinfo is None:
+                    ts = ts.astimezone()
+                rows.append(CountingEvent(
+                    session=session,
+                    camera_id=session.camera_id,
+                    ts=ts,
+                    kind=event.get('kind', ''),
+                    delta=event.get('delta', 1),
+                    track_id=event.get('track_id'),
+                    class_name=event.get('class_name'),
+                    region=event.get('line') or event.get('zone'),
+                ))
+
+            with transaction.atomic():
+                if options['force']:
+                    session.events.all().delete()
+                CountingEvent.objects.bulk_create(rows, batch_size=options['batch_size'])
+
+            imported_sessions += 1
+            imported_events += len(rows)
+            self.stdout.write(f'✓ Sessão {session.id}: {len(rows)} eventos')
+
+        self.stdout.write(
+            self.style.SUCCESS(f'\n{imported_events} eventos importados de {imported_sessions} sessões')
+        )
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from apps.video_ao_vivo.models import CountingRollup
+
+
+class Command(BaseCommand):
+    help = 'Recalcula os totais por hora/dia (CountingRollup) a partir das sessões finalizadas'
+
+    def handle(self, *args, **options):
+        rows = CountingRollup.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'✓ {rows} janelas recalculadas'))
@@ -13,6 +13,8 @@ class CountingSession(models.Model):
     total_in = models.IntegerField(default=0)
     total_out = models.IntegerField(default=0)
     balance = models.IntegerField(default=0)
+    # Totais por classe: {"pig": {"in": 10, "out": 2}, ...}
+    class_totals = models.JSONField(default=dict, blank=True)
     
     # Path do log para auditoria
     log_file_path = models.CharField(max_length=500, blank=True, null=True)
@@ -32,4 +34,148 @@ class CountingSession(models.Model):
         ordering = ['-started_at']
     
     def __str__(self):
-        return f"Sessão {self.id} - {self.camera.name} ({self.started_at})"
\ No newline at end of file
+        return f"Sessão {self.id} - {self.camera.name} ({self.started_at})"
+
+class CountingEvent(models.Model):
+    """Evento de contagem (um cruzamento/entrada/saída) de uma sessão."""
+    
+    KIND_CHOICES = [
+        ("IN", "Entrada"),
+        ("OUT", "Saída"),
+        ("ENTER", "Entrou na zona"),
+        ("EXIT", "Saiu da zona"),
+    ]
+    
+    session = models.ForeignKey(CountingSession, on_delete=models.CASCADE, related_name="events")
+    camera = models.ForeignKey(Camera, on_delete=models.CASCADE, related_name="counting_events")
+    ts = models.DateTimeField()
+    kind = models.CharField(max_length=5, choices=KIND_CHOICES)
+    delta = models.SmallIntegerField(default=1)
+    track_id = models.IntegerField(blank=True, null=True)
+    class_name = models.CharField(max_length=100, blank=True, null=True)
+    # Linha/zona nomeada do evento (vazio = linha principal)
+    region = models.CharField(max_length=100, blank=True, null=True)
+    
+    class Meta:
+        db_table = "counting_events"
+        ordering = ["ts"]
+        indexes = [
+            models.Index(fields=["camera", "ts"], name="counting_ev_camera_ts"),
+            models.Index(fields=["session", "ts"], name="counting_ev_session_ts"),
+        ]
+    
+    def __str__(self):
+        return f"{self.kind} #{self.track_id} - sessão {self.session_id} ({self.ts})"
+
+
+class CountingRollup(models.Model):
+    """
+    Totais pré-agregados das sessões finalizadas por hora e por dia.
+
+    Cada linha soma as sessões de um usuário/câmera/tipo de animal que
+    começaram na janela (mesmo critério que os painéis usavam com
+    started_at). Atualizada na mesma transação que finaliza a sessão;
+    `manage.py rebuild_counting_rollups` recalcula tudo a partir das sessões.
+    """
+    
+    HOUR = "hour"
+    DAY = "day"
+    GRANULARITY_CHOICES = [(HOUR, "Hora"), (DAY, "Dia")]
+    
+    granularity = models.CharField(max_length=4, choices=GRANULARITY_CHOICES)
+    # Início da janela no fuso configurado (TIME_ZONE)
+    bucket = models.DateTimeField()
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    camera = models.ForeignKey(Camera, on_delete=models.CASCADE)
+    animal_type = models.CharField(max_length=100, blank=True, default="")
+    
+    sessions = models.IntegerField(default=0)
+    total_in = models.IntegerField(default=0)
+    total_out = models.IntegerField(default=0)
+    
+    class Meta:
+        db_table = "counting_rollups"
+        ordering = ["granularity", "bucket"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["granularity", "bucket", "user", "camera", "animal_type"],
+                name="counting_rollup_unique_bucket",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["granularity", "bucket"], name="counting_rollup_bucket"),
+            models.Index(fields=["user", "granularity", "bucket"], name="counting_rollup_user_bucket"),
+        ]
+    
+    def __str__(self):
+        return f"{self.granularity} {self.bucket} - {self.camera_id}/{self.animal_type}"
+    
+    @staticmethod
+    def session_animal_type(session):
+        return session.animal_type or session.camera.detection_class_name or ""
+    
+    @classmethod
+    def record_session(cls, session):
+        """Soma uma sessão finalizada nas janelas de hora e dia. Chamar dentro de transaction.atomic()."""
+        from django.db.models import F
+        from django.utils import timezone
+        
+        local = timezone.localtime(session.started_at)
+        buckets = {
+            cls.HOUR: local.replace(minute=0, second=0, microsecond=0),
+            cls.DAY: local.replace(hour=0, minute=0, second=0, microsecond=0),
+        }
+        animal_type = cls.session_animal_type(session)
+        for granularity, bucket in buckets.items():
+            rollup, _ = cls.objects.get_or_create(
+                granularity=granularity,
+                bucket=bucket,
+                user_id=session.user_id,
+                camera_id=session.camera_id,
+                animal_type=animal_type,
+            )
+            # F(): soma no banco, sem perder atualizações concorrentes
+            cls.objects.filter(pk=rollup.pk).update(
+                sessions=F("sessions") + 1,
+                total_in=F("total_in") + session.total_in,
+                total_out=F("total_out") + session.total_out,
+            )
+    
+    @classmethod
+    def rebuild(cls):
+        """Recalcula todas as janelas a partir das sessões finalizadas; retorna o número de linhas."""
+        from django.db import transaction
+        from django.db.models import Count, Sum, Value
+        from django.db.models.functions import Coalesce, NullIf, TruncDay, TruncHour
+        
+        animal_type = Coalesce(
+            NullIf("animal_type", Value("")),
+            NullIf("camera__detection_class_name", Value("")),
+            Value(""),
+        )
+        rows = []
+        for granularity, trunc in ((cls.HOUR, TruncHour), (cls.DAY, TruncDay)):
+            grouped = (
+                CountingSession.objects.filter(ended_at__isnull=False)
+                .annotate(rollup_bucket=trunc("started_at"), rollup_animal=animal_type)
+                .values("rollup_bucket", "user_id", "camera_id", "rollup_animal")
+                .annotate(n=Count("id"), sum_in=Sum("total_in"), sum_out=Sum("total_out"))
+                .order_by()
+            )
+            rows.extend(
+                cls(
+                    granularity=granularity,
+                    bucket=row["rollup_bucket"],
+                    user_id=row["user_id"],
+                    camera_id=row["camera_id"],
+                    animal_type=row["rollup_animal"],
+                    sessions=row["n"],
+                    total_in=row["sum_in"] or 0,
+                    total_out=row["sum_out"] or 0,
+                )
+                for row in grouped
+            )
+        with transaction.atomic():
+            cls.objects.all().delete()
+            cls.objects.bulk_create(rows, batch_size=1000)
+        return len(rows)
@@ -0,0 +1,123 @@
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+import cv2
+import numpy as np
+
+
+@dataclass(frozen=True)
+class CapturedFrame:
+    image: np.ndarray
+    seq: int      # número sequencial do frame lido da fonte (1, 2, 3...)
+    ts: float     # time.time() do momento da captura
+
+
+class FrameGrabber:
+    """
+    Estágio de captura: drena a fonte de vídeo continuamente numa thread
+    dedicada e mantém apenas o frame mais recente ("latest-frame slot").
+
+    Quem consome (a inferência) sempre pega o frame mais novo; frames que
+    chegaram enquanto a inferência estava ocupada são descartados em vez de
+    se acumularem no buffer do OpenCV.
+    """
+
+    def __init__(self, source: str, reconnect_after: int = 50, reconnect_delay: float = 1.0):
+        self.source = str(source)
+        self.reconnect_after = reconnect_after
+        self.reconnect_delay = reconnect_delay
+
+        self.cap = None
+        self.fps = 30.0
+        # arquivos locais são lidos no ritmo do fps para simular câmera ao vivo
+        self.is_file = os.path.isfile(self.source)
+
+        self._cond = threading.Condition()
+        self._latest: Optional[CapturedFrame] = None
+        self._seq = 0
+        self._running = False
+        self._thread = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._running
+
+    def open(self) -> bool:
+        self.cap = cv2.VideoCapture(self.source)
+        if not self.cap.isOpened():
+            return False
+        # buffer mínimo: o slot já guarda o frame mais recente
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        self.fps = float(self.cap.get(cv2.CAP_PROP_FPS) or 30.0)
+        return True
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2.0)
+
+    def read_latest(self, after_seq: int = 0, timeout: float = 1.0) -> Optional[CapturedFrame]:
+        """Retorna o frame mais recente com seq > after_seq (espera até timeout)."""
+        with self._cond:
+            if self._seq <= after_seq:
+                self._cond.wait_for(lambda: self._seq > after_seq or not self._running, timeout)
+            if self._seq <= after_seq:
+                return None
+            return self._latest
+
+    def _publish(self, image):
+        with self._cond:
+            self._seq += 1
+            self._latest = CapturedFrame(image=image, seq=self._seq, ts=time.time())
+            self._cond.notify_all()
+
+    def _reconnect(self):
+        if self.cap:
+            self.cap.release()
+        time.sleep(self.reconnect_delay)
+        self.cap = cv2.VideoCapture(self.source)
+
+    def _loop(self):
+        frame_interval = 1.0 / max(self.fps, 1.0)
+        failures = 0
+        try:
+            while self._running:
+                t0 = time.monotonic()
+                ok, frame = self.cap.read()
+                if not ok:
+                    if self.is_file:
+                        # loop no vídeo (teste)
+                        self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                        continue
+                    failures += 1
+                    if failures >= self.reconnect_after:
+                        print(f"Captura: {failures} falhas seguidas, reconectando {self.source}")
+                        self._reconnect()
+                        failures = 0
+                    else:
+                        time.sleep(0.01)
+                    continue
+
+                failures = 0
+                self._publish(frame)
+
+                if self.is_file:
+                    elapsed = time.monotonic() - t0
+                    if elapsed < frame_interval:
+                        time.sleep(frame_interval - elapsed)
+        finally:
+            with self._cond:
+                self._running = False
+                self._cond.notify_all()
+            if self.cap:
+                self.cap.release()
@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import Optional, Tuple
+from typing import List, Optional, Tuple
 
 Point = Tuple[float, float]  # (x,y) normalizado 0..1
 
@@ -9,9 +9,44 @@ class CounterConfig:
     conf_thres: float = 0.25
     resize_scale: float = 1.0
     device: str = "cpu"
+    # runtime de inferência: "torch" | "onnx" | "openvino"
+    backend: str = "torch"
+    # usar variante INT8 (onnxruntime) quando existir
+    quantized: bool = False
+
+    # roda o detector 1 a cada N frames; entre keyframes as caixas são
+    # extrapoladas pelo TrackPredictor. Volta para 1 com objetos perto da linha.
+    detect_stride: int = 1
+    stride_line_margin: float = 0.15  # distância da linha (fração da altura)
+
+    # inferência só numa faixa horizontal em torno da linha
+    # (altura da faixa como fração da altura do frame; 0 = frame inteiro)
+    roi_band: float = 0.0
+
+    # pula detector/tracker enquanto não há movimento na região de contagem
+    motion_gate: bool = False
+    motion_threshold: float = 0.005  # fração de pixels alterados
+    motion_hold_frames: int = 30     # frames ativos após o último movimento
+
+    # estado por track: descarta ids não vistos há track_ttl_s e limita o total
+    track_ttl_s: float = 30.0
+    max_tracks: int = 5000
+
+    # preview MJPEG: anotado e codificado só com viewers (perfil da câmera)
+    preview_fps: float = 10.0
+    preview_max_width: int = 0       # 0 = resolução do processamento
+    preview_jpeg_quality: int = 75
 
     # linha normalizada (ponta a ponta = x=0 e x=1)
     line_y_norm: float = 0.5  # default no meio
-    # se quiser suportar linha livre no futuro:
+    # linha livre: segmento p1->p2 ou polilinha (tem prioridade sobre line_y_norm).
+    # OUT = passar do lado esquerdo para o direito de quem anda de p1 para p2
+    # (na linha horizontal da esquerda para a direita: de cima para baixo)
     line_p1: Optional[Point] = None
     line_p2: Optional[Point] = None
+    line_points: Optional[List[Point]] = None
+
+    # linhas e zonas nomeadas extras: [{"name": "portao A", "points": [(x,y), ...]}]
+    # cada uma com contadores e eventos próprios, sobre as mesmas detecções
+    lines: Optional[List[dict]] = None
+    zones: Optional[List[dict]] = None
@@ -0,0 +1,237 @@
+import numpy as np
+
+
+def _cross(u, v):
+    return u[..., 0] * v[..., 1] - u[..., 1] * v[..., 0]
+
+
+def crossing_direction(p, q, polyline):
+    """
+    Direção do cruzamento de cada deslocamento p[i] -> q[i] com a polilinha.
+
+    Retorna +1 (OUT), -1 (IN) ou 0 (não cruzou). O lado de um ponto é o sinal
+    do produto vetorial com o segmento: numa linha horizontal desenhada da
+    esquerda para a direita, de cima para baixo é OUT, como antes.
+    """
+    p = np.asarray(p, dtype=np.float32).reshape(-1, 1, 2)
+    q = np.asarray(q, dtype=np.float32).reshape(-1, 1, 2)
+    poly = np.asarray(polyline, dtype=np.float32)
+    a = poly[:-1][None]   # (1, S, 2)
+    b = poly[1:][None]
+    d = b - a
+
+    side_p = np.where(_cross(d, p - a) < 0, -1, 1)
+    side_q = np.where(_cross(d, q - a) < 0, -1, 1)
+    m = q - p
+    # extremos do segmento em lados opostos (ou sobre) a reta do deslocamento
+    within = _cross(m, a - p) * _cross(m, b - p) <= 0
+    hit = (side_p != side_q) & within
+
+    first = hit.argmax(axis=1)
+    rows = np.arange(len(first))
+    return np.where(hit[rows, first], side_q[rows, first], 0)
+
+
+def points_in_polygon(points, polygon):
+    """Ray casting vetorizado: máscara (N,) dos pontos dentro do polígono."""
+    pts = np.asarray(points, dtype=np.float32).reshape(-1, 1, 2)
+    poly = np.asarray(polygon, dtype=np.float32)
+    a = poly[None]                          # (1, E, 2)
+    b = np.roll(poly, -1, axis=0)[None]
+    x, y = pts[..., 0], pts[..., 1]
+    straddles = (a[..., 1] > y) != (b[..., 1] > y)
+    dy = np.where(b[..., 1] == a[..., 1], 1e-9, b[..., 1] - a[..., 1])
+    x_cross = a[..., 0] + (y - a[..., 1]) * (b[..., 0] - a[..., 0]) / dy
+    return ((straddles & (x < x_cross)).sum(axis=1) % 2) == 1
+
+
+def distance_to_polyline(points, polyline):
+    """Menor distância de cada ponto (N, 2) à polilinha."""
+    pts = np.asarray(points, dtype=np.float32).reshape(-1, 1, 2)
+    poly = np.asarray(polyline, dtype=np.float32)
+    a = poly[:-1][None]
+    d = poly[1:][None] - a
+    t = np.clip(((pts - a) * d).sum(-1) / np.maximum((d * d).sum(-1), 1e-9), 0.0, 1.0)
+    closest = a + t[..., None] * d
+    return np.sqrt(((pts - closest) ** 2).sum(-1)).min(axis=1)
+
+
+def values_for(ids, values, query):
+    """values[i] do ids[i] correspondente a cada id de query (ids únicos)."""
+    ids = np.asarray(ids)
+    order = np.argsort(ids)
+    return np.asarray(values)[order][np.searchsorted(ids[order], query)]
+
+
+class _TrackTable:
+    """
+    Estado por track em arrays ordenados por id (busca com searchsorted).
+
+    Além das colunas de cada subclasse guarda o último frame em que o id foi
+    visto. O ByteTrack gera ids novos continuamente; ids não vistos há
+    ttl_frames são descartados e o total fica limitado a max_tracks (sai
+    quem foi visto há mais tempo).
+    """
+
+    # (atributo, dtype, formato por track)
+    _columns = ()
+
+    def __init__(self, ttl_frames: int = 300, max_tracks: int = 5000):
+        self.ttl_frames = ttl_frames
+        self.max_tracks = max_tracks
+        self._ids = np.zeros((0,), dtype=np.int64)
+        self._last_seen = np.zeros((0,), dtype=np.int64)
+        for name, dtype, shape in self._columns:
+            setattr(self, name, np.zeros((0,) + shape, dtype=dtype))
+        self.evicted = 0
+
+    def __len__(self):
+        return len(self._ids)
+
+    def _arrays(self):
+        return [self._ids, self._last_seen] + [getattr(self, name) for name, _, _ in self._columns]
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in self._arrays())
+
+    def _lookup(self, ids):
+        """Posição de cada id no estado e máscara dos ids já conhecidos."""
+        pos = np.searchsorted(self._ids, ids)
+        known = pos < len(self._ids)
+        known[known] = self._ids[pos[known]] == ids[known]
+        return pos, known
+
+    def _touch(self, kpos, frame_idx: int):
+        self._last_seen[kpos] = frame_idx
+
+    def _append(self, ids, frame_idx: int, **values):
+        """Insere ids novos (valores por coluna) mantendo a ordenação."""
+        n = len(ids)
+        self._ids = np.concatenate([self._ids, ids])
+        self._last_seen = np.concatenate([self._last_seen, np.full(n, frame_idx, dtype=np.int64)])
+        for name, dtype, shape in self._columns:
+            new = values.get(name)
+            if new is None:
+                new = np.zeros((n,) + shape, dtype=dtype)
+            setattr(self, name, np.concatenate([getattr(self, name), np.asarray(new, dtype=dtype)]))
+        self._select(np.argsort(self._ids, kind="stable"))
+
+    def _select(self, index):
+        self._ids = self._ids[index]
+        self._last_seen = self._last_seen[index]
+        for name, _, _ in self._columns:
+            setattr(self, name, getattr(self, name)[index])
+
+    def evict(self, frame_idx: int) -> int:
+        """Remove ids expirados (TTL) e o excesso acima de max_tracks."""
+        before = len(self._ids)
+        keep = self._last_seen >= frame_idx - self.ttl_frames
+        if keep.sum() > self.max_tracks:
+            # mantém os vistos mais recentemente
+            cutoff = np.partition(self._last_seen, -self.max_tracks)[-self.max_tracks]
+            keep &= self._last_seen >= cutoff
+        if not keep.all():
+            self._select(np.flatnonzero(keep))  # preserva a ordenação por id
+        removed = before - len(self._ids)
+        self.evicted += removed
+        return removed
+
+
+class CrossingCounter(_TrackTable):
+    """
+    Contagem de cruzamentos de uma linha (segmento ou polilinha).
+
+    Para cada id: centroide no último frame e o índice do frame até o qual
+    novos cruzamentos são ignorados (debounce). Cada frame é processado de
+    uma vez com operações vetorizadas, sem laço Python por detecção: o
+    deslocamento de cada track desde o frame anterior é testado contra os
+    segmentos da linha de contagem.
+    """
+
+    _columns = (
+        ("_pos", np.float32, (2,)),
+        ("_cooldown_until", np.int64, ()),
+    )
+
+    def __init__(self, cooldown_frames: int = 20, ttl_frames: int = 300, max_tracks: int = 5000):
+        super().__init__(ttl_frames, max_tracks)
+        self.cooldown_frames = cooldown_frames
+
+    def update(self, ids, centroids, polyline, frame_idx: int):
+        """
+        Registra as posições do frame e retorna (ids_in, ids_out).
+
+        centroids é (N, 2) e polyline (K, 2), ambos em pixels do frame.
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        if len(ids) == 0:
+            return ids, ids
+        centroids = np.asarray(centroids, dtype=np.float32).reshape(-1, 2)
+
+        pos, known = self._lookup(ids)
+        kpos = pos[known]
+        direction = crossing_direction(self._pos[kpos], centroids[known], polyline)
+
+        crossed = (direction != 0) & (self._cooldown_until[kpos] <= frame_idx)
+        kids = ids[known]
+        ids_out = kids[crossed & (direction == 1)]
+        ids_in = kids[crossed & (direction == -1)]
+
+        self._pos[kpos] = centroids[known]
+        self._touch(kpos, frame_idx)
+        self._cooldown_until[kpos[crossed]] = frame_idx + self.cooldown_frames
+
+        # ids novos: só registra a posição (sem histórico não há cruzamento)
+        if not known.all():
+            new = ~known
+            self._append(ids[new], frame_idx, _pos=centroids[new])
+
+        return ids_in, ids_out
+
+    def clear(self):
+        self.__init__(self.cooldown_frames, self.ttl_frames, self.max_tracks)
+
+
+class ZoneCounter(_TrackTable):
+    """
+    Entradas/saídas de um polígono e ocupação atual.
+
+    Um track visto pela primeira vez já dentro da zona conta na ocupação,
+    mas não gera entrada (não se sabe de onde veio). Um frame sem ids (gate
+    de movimento ocioso: animais parados) não altera a ocupação.
+    """
+
+    _columns = (("_inside", np.bool_, ()),)
+
+    def __init__(self, ttl_frames: int = 300, max_tracks: int = 5000):
+        super().__init__(ttl_frames, max_tracks)
+        self.occupancy = 0
+
+    def update(self, ids, centroids, polygon, frame_idx: int):
+        """Registra as posições do frame e retorna (ids_entraram, ids_sairam)."""
+        ids = np.asarray(ids, dtype=np.int64)
+        if len(ids) == 0:
+            return ids, ids
+        inside = points_in_polygon(centroids, polygon)
+        self.occupancy = int(inside.sum())
+
+        pos, known = self._lookup(ids)
+        kpos = pos[known]
+        prev = self._inside[kpos]
+        kinside = inside[known]
+        kids = ids[known]
+        ids_enter = kids[kinside & ~prev]
+        ids_exit = kids[~kinside & prev]
+
+        self._inside[kpos] = kinside
+        self._touch(kpos, frame_idx)
+
+        if not known.all():
+            new = ~known
+            self._append(ids[new], frame_idx, _inside=inside[new])
+
+        return ids_enter, ids_exit
+
+    def clear(self):
+        self.__init__(self.ttl_frames, self.max_tracks)
@@ -0,0 +1,48 @@
+from typing import Optional
+
+import cv2
+
+# libjpeg-turbo (PyTurboJPEG) é opcional: sem ela usa cv2.imencode
+try:
+    from turbojpeg import TJPF_BGR, TJSAMP_420, TurboJPEG
+except ImportError:
+    TurboJPEG = None
+
+
+class JpegEncoder:
+    """Codificador JPEG do preview (libjpeg-turbo quando disponível)."""
+
+    def __init__(self, quality: int = 75):
+        self.quality = max(1, min(100, int(quality)))
+        self.backend = "cv2"
+        self._turbo = None
+        if TurboJPEG is not None:
+            try:
+                # falha se a biblioteca nativa libturbojpeg não estiver instalada
+                self._turbo = TurboJPEG()
+                self.backend = "turbojpeg"
+            except Exception as e:
+                print(f"libjpeg-turbo indisponível, usando OpenCV: {e}")
+
+    def encode(self, frame) -> Optional[bytes]:
+        if self._turbo is not None:
+            try:
+                return self._turbo.encode(frame, quality=self.quality,
+                                          pixel_format=TJPF_BGR, jpeg_subsample=TJSAMP_420)
+            except Exception as e:
+                print(f"Erro no libjpeg-turbo, usando OpenCV: {e}")
+                self._turbo = None
+                self.backend = "cv2"
+        ok, buf = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+        return buf.tobytes() if ok else None
+
+
+def fit_width(frame, max_width: int):
+    """Reduz o frame para caber em max_width; retorna (frame, escala)."""
+    w = frame.shape[1]
+    if not max_width or w <= max_width:
+        return frame, 1.0
+    scale = max_width / w
+    resized = cv2.resize(frame, (max_width, max(1, int(round(frame.shape[0] * scale)))),
+                         interpolation=cv2.INTER_AREA)
+    return resized, scale
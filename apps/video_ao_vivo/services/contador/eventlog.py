@@ -0,0 +1,188 @@
+import json
+import queue
+import threading
+import time
+from pathlib import Path
+
+_STOP = object()
+
+
+class BatchWriter:
+    """
+    Escrita em lote numa thread própria.
+
+    Quem produz (a thread do processador) só enfileira e nunca espera I/O.
+    A thread de escrita junta os itens e grava quando o lote atinge
+    batch_size ou quando o item mais antigo espera flush_interval segundos.
+    A fila é limitada: se o destino travar, itens excedentes são descartados
+    (e contados em `dropped`) em vez de crescer a memória sem limite.
+    Subclasses implementam _write_batch().
+    """
+
+    def __init__(self, batch_size: int = 200, flush_interval: float = 1.0,
+                 max_queue: int = 10000, name: str = "batch-writer"):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._closed = False
+        self.written = 0
+        self.dropped = 0
+        self.errors = 0
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, item) -> bool:
+        if self._closed:
+            # item chegou depois do close(): perdido, mas contado
+            self.dropped += 1
+            return False
+        try:
+            self._queue.put_nowait(item)
+            return True
+        except queue.Full:
+            if self.dropped == 0:
+                print(f"{self._thread.name}: fila cheia, descartando itens")
+            self.dropped += 1
+            return False
+
+    def close(self, timeout: float = 10.0):
+        """Grava o que falta e encerra a thread."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def _write_batch(self, batch):
+        raise NotImplementedError
+
+    def _on_exit(self):
+        """Chamado na thread de escrita ao encerrar (liberar recursos)."""
+
+    def _flush(self, batch):
+        try:
+            self._write_batch(batch)
+            self.written += len(batch)
+        except Exception as e:
+            self.errors += 1
+            print(f"{self._thread.name}: erro ao gravar lote de {len(batch)}: {e}")
+
+    def _run(self):
+        batch = []
+        deadline = 0.0
+        while True:
+            timeout = max(0.0, deadline - time.monotonic()) if batch else None
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+            if item is _STOP:
+                break
+            if item is not None:
+                if not batch:
+                    deadline = time.monotonic() + self.flush_interval
+                batch.append(item)
+            if batch and (len(batch) >= self.batch_size or time.monotonic() >= deadline):
+                self._flush(batch)
+                batch = []
+        if batch:
+            self._flush(batch)
+        self._on_exit()
+
+
+def _dumps(record) -> str:
+    return json.dumps(record, separators=(",", ":"), ensure_ascii=False)
+
+
+class JsonlEventLog(BatchWriter):
+    """
+    Log de sessão em JSON Lines, só com append.
+
+    Uma linha de cabeçalho ({"type": "header", ...}), uma por evento
+    ({"type": "event", ...}) e, ao finalizar, uma de rodapé com os totais
+    ({"type": "footer", ...}). Gravar um evento custa O(1), sem reler o
+    arquivo.
+    """
+
+    def __init__(self, path, **kwargs):
+        self.path = Path(path)
+        kwargs.setdefault("name", f"eventlog-{self.path.stem}")
+        super().__init__(**kwargs)
+
+    def header(self, **fields):
+        self.submit({"type": "header", **fields})
+
+    def event(self, **fields):
+        self.submit({"type": "event", **fields})
+
+    def footer(self, **fields):
+        self.submit({"type": "footer", **fields})
+
+    def _write_batch(self, batch):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("".join(_dumps(r) + "\n" for r in batch))
+
+
+class CountingEventWriter(BatchWriter):
+    """
+    Grava os eventos da sessão na tabela CountingEvent com bulk_create.
+
+    Itens são dicts com os campos do modelo (session_id, camera_id, ts,
+    kind, ...). A thread de escrita usa a própria conexão com o banco, que
+    é fechada ao encerrar.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault("name", "counting-events")
+        super().__init__(**kwargs)
+
+    def _write_batch(self, batch):
+        from django.db import close_old_connections
+        from apps.video_ao_vivo.models import CountingEvent
+
+        close_old_connections()
+        CountingEvent.objects.bulk_create([CountingEvent(**fields) for fields in batch])
+
+    def _on_exit(self):
+        from django.db import connection
+
+        connection.close()
+
+
+def iter_records(path):
+    """Registros de um log .jsonl; ignora linha truncada (queda no meio da escrita)."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+
+def read_log(path) -> dict:
+    """
+    Lê um log de sessão no formato antigo (JSON único) ou JSONL.
+
+    Retorna sempre o formato antigo: campos do cabeçalho e do rodapé no
+    nível de cima e a lista em "events".
+    """
+    path = Path(path)
+    if path.suffix != ".jsonl":
+        with open(path, "r") as f:
+            data = json.load(f)
+        data.setdefault("events", [])
+        return data
+
+    data = {}
+    events = []
+    for record in iter_records(path):
+        kind = record.pop("type", "event")
+        if kind == "event":
+            events.append(record)
+        else:
+            data.update(record)
+    data["events"] = events
+    return data
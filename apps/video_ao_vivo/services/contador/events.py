@@ -0,0 +1,78 @@
+import time
+from bisect import bisect_right
+
+from .streaming import Notifier
+
+
+class EventRing(Notifier):
+    """
+    Últimos `capacity` eventos de uma câmera, indexados pelo id.
+
+    Os ids são crescentes, então a busca por "eventos depois de X" é um
+    bisect (O(log n)) em vez de varrer o buffer. Quando o buffer enche os
+    mais antigos saem; um cliente que pede a partir de um id já descartado
+    recebe gap=True para saber que perdeu eventos (e recarregar o estado
+    pelo status/histórico). Como Notifier, permite esperar por eventos
+    novos (long-poll) sem polling.
+    """
+
+    def __init__(self, capacity: int = 5000):
+        super().__init__()
+        self.capacity = max(1, int(capacity))
+        self._ids = []
+        self._events = []
+        self._head = 0  # início lógico; compactado de tempos em tempos
+        self.evicted_upto = 0  # maior id já descartado
+
+    def __len__(self):
+        return len(self._ids) - self._head
+
+    @property
+    def last_id(self) -> int:
+        with self._cond:
+            return self._ids[-1] if len(self._ids) > self._head else self.evicted_upto
+
+    def append(self, event: dict):
+        with self._cond:
+            self._ids.append(event["id"])
+            self._events.append(event)
+            if len(self._ids) - self._head > self.capacity:
+                self.evicted_upto = self._ids[self._head]
+                self._events[self._head] = None
+                self._head += 1
+                if self._head >= self.capacity:
+                    # compacta: custo O(capacity) a cada `capacity` eventos
+                    del self._ids[:self._head]
+                    del self._events[:self._head]
+                    self._head = 0
+            self.seq += 1
+            self._notify()
+
+    def after(self, after_id: int, limit: int = None):
+        """Retorna (eventos com id > after_id, gap)."""
+        with self._cond:
+            start = bisect_right(self._ids, after_id, lo=self._head)
+            end = len(self._ids) if limit is None else min(len(self._ids), start + limit)
+            return self._events[start:end], after_id < self.evicted_upto
+
+    def wait_after(self, after_id: int, timeout: float = 25.0, limit: int = None):
+        """Long-poll: bloqueia até haver evento com id > after_id ou até o timeout."""
+        deadline = time.monotonic() + timeout
+        while True:
+            seq = self.seq
+            events, gap = self.after(after_id, limit)
+            remaining = deadline - time.monotonic()
+            if events or gap or remaining <= 0:
+                return events, gap
+            self.wait_seq(seq, remaining)
+
+    async def wait_after_async(self, after_id: int, timeout: float = 25.0, limit: int = None):
+        """Versão para views async de wait_after()."""
+        deadline = time.monotonic() + timeout
+        while True:
+            seq = self.seq
+            events, gap = self.after(after_id, limit)
+            remaining = deadline - time.monotonic()
+            if events or gap or remaining <= 0:
+                return events, gap
+            await self.wait_seq_async(seq, remaining)
@@ -0,0 +1,171 @@
+import importlib.util
+import os
+import threading
+from pathlib import Path
+
+from django.conf import settings
+
+# backend de runtime -> formato de exportação do ultralytics
+BACKEND_FORMATS = {
+    "onnx": "onnx",
+    "openvino": "openvino",
+}
+
+# pacotes de que o exportador de cada backend depende
+BACKEND_REQUIREMENTS = {
+    "onnx": ("onnx", "onnxruntime"),
+    "openvino": ("openvino",),
+}
+
+
+def exporter_available(backend: str) -> bool:
+    """As dependências do exportador estão instaladas? (sem importá-las)"""
+    return all(importlib.util.find_spec(mod) is not None for mod in BACKEND_REQUIREMENTS.get(backend, ()))
+
+
+def artifact_path(pt_path, backend: str) -> Path:
+    """Caminho onde o ultralytics grava o artefato exportado (ao lado do .pt)."""
+    pt = Path(pt_path)
+    if backend == "onnx-int8":
+        # variante quantizada gerada por quantize.quantize_model
+        return pt.with_name(f"{pt.stem}.int8.onnx")
+    if backend == "onnx":
+        return pt.with_suffix(".onnx")
+    if backend == "openvino":
+        return pt.parent / f"{pt.stem}_openvino_model"
+    return pt
+
+
+def is_fresh(artifact, pt_path) -> bool:
+    """Artefato existe e é mais novo que o .pt (não sobrou de um modelo substituído)."""
+    try:
+        return Path(artifact).stat().st_mtime >= Path(pt_path).stat().st_mtime
+    except OSError:
+        return False
+
+
+def resolve_runtime_path(pt_path, backend: str, quantized: bool = False):
+    """
+    Retorna (caminho, backend) a usar na inferência.
+
+    Com quantized=True usa a variante INT8 (roda no onnxruntime). Se o
+    artefato pedido ainda não foi gerado, ou é mais antigo que o .pt, cai
+    para o backend configurado e, por fim, para o .pt com PyTorch.
+    """
+    if quantized:
+        path = artifact_path(pt_path, "onnx-int8")
+        if is_fresh(path, pt_path):
+            return str(path), "onnx"
+        print(f"Variante INT8 ausente ou desatualizada para {pt_path}, usando FP32")
+    if backend and backend != "torch":
+        path = artifact_path(pt_path, backend)
+        if is_fresh(path, pt_path):
+            return str(path), backend
+        print(f"Artefato {backend} ausente ou desatualizado para {pt_path}, usando PyTorch")
+    return str(pt_path), "torch"
+
+
+def relative_to_media(path: Path) -> str:
+    try:
+        return str(Path(path).relative_to(Path(settings.MEDIA_ROOT)))
+    except ValueError:
+        return str(path)
+
+
+def export_model(model_config, backends=("onnx",), imgsz: int = 640):
+    """
+    Exporta o .pt de um ModelConfiguration para ONNX e/ou OpenVINO IR.
+
+    Os artefatos ficam ao lado do .pt e os caminhos (relativos ao
+    MEDIA_ROOT) são gravados no próprio ModelConfiguration. O grafo é
+    exportado com batch dinâmico: a InferenceEngine junta frames de várias
+    câmeras (até COUNTER_INFERENCE_MAX_BATCH) num único predict. Retorna
+    {backend: caminho absoluto}.
+    """
+    from .processor import YOLO
+    if YOLO is None:
+        raise RuntimeError("YOLO não disponível")
+
+    pt_path = model_config.model_file.path
+    # instância própria: a exportação altera o modelo (fuse), não usar o cache
+    model = YOLO(pt_path)
+
+    exported = {}
+    for backend in backends:
+        fmt = BACKEND_FORMATS.get(backend)
+        if fmt is None:
+            raise ValueError(f"Backend sem exportação: {backend}")
+        # dynamic=True: eixo de batch livre (export padrão é batch 1 fixo)
+        result = model.export(format=fmt, imgsz=imgsz, dynamic=True)
+        path = Path(result) if isinstance(result, (str, os.PathLike)) else artifact_path(pt_path, backend)
+        if not path.exists():
+            raise RuntimeError(f"Exportação {backend} não gerou {path}")
+        exported[backend] = path
+
+    update_fields = []
+    if "onnx" in exported:
+        model_config.onnx_path = relative_to_media(exported["onnx"])
+        update_fields.append("onnx_path")
+    if "openvino" in exported:
+        model_config.openvino_path = relative_to_media(exported["openvino"])
+        update_fields.append("openvino_path")
+    if update_fields:
+        model_config.save(update_fields=update_fields)
+
+    return exported
+
+
+_jobs_lock = threading.Lock()
+_jobs = set()  # (model_config.pk, tarefa) em andamento neste processo
+
+
+def start_background_job(key, target):
+    """
+    Roda target numa thread daemon (exportação/quantização levam minutos).
+
+    Retorna None se a mesma tarefa (key) já está em andamento. A conexão com
+    o banco aberta pela thread é fechada ao final.
+    """
+    with _jobs_lock:
+        if key in _jobs:
+            return None
+        _jobs.add(key)
+
+    def run():
+        from django.db import connection
+        try:
+            target()
+        finally:
+            connection.close()
+            with _jobs_lock:
+                _jobs.discard(key)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
+
+
+def export_model_async(model_config, backends=None):
+    """
+    Exporta em segundo plano (upload e admin não esperam a conversão).
+
+    Retorna a thread, ou None se não há backend com dependências instaladas
+    ou se o modelo já está sendo exportado.
+    """
+    if backends is None:
+        backends = getattr(settings, "COUNTER_EXPORT_ON_UPLOAD", ())
+    available = tuple(b for b in backends if exporter_available(b))
+    for backend in set(backends) - set(available):
+        print(f"Exportação {backend} ignorada: dependências não instaladas")
+    backends = available
+    if not backends:
+        return None
+
+    def run():
+        try:
+            paths = export_model(model_config, backends)
+            print(f"Modelo {model_config.name} exportado: {', '.join(paths)}")
+        except Exception as e:
+            print(f"Erro ao exportar modelo {model_config.name}: {e}")
+
+    return start_background_job((model_config.pk, "export"), run)
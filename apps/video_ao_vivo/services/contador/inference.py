@@ -0,0 +1,295 @@
+import queue
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+import torch
+
+
+@dataclass
+class Detections:
+    xyxy: np.ndarray                # (N, 4) em pixels do frame enviado
+    ids: Optional[np.ndarray]       # (N,) ids do tracker ou None sem tracking
+    cls: np.ndarray                 # (N,)
+    conf: np.ndarray                # (N,)
+
+    def __len__(self):
+        return len(self.xyxy)
+
+    @classmethod
+    def empty(cls, tracked: bool = True):
+        return cls(
+            xyxy=np.zeros((0, 4), dtype=np.float32),
+            ids=np.zeros((0,), dtype=int) if tracked else None,
+            cls=np.zeros((0,), dtype=int),
+            conf=np.zeros((0,), dtype=np.float32),
+        )
+
+
+def _make_tracker(frame_rate: int):
+    """Cria um BYTETracker independente (um por câmera)."""
+    try:
+        # ultralytics >= 8.1
+        from ultralytics.trackers.byte_tracker import BYTETracker
+        from ultralytics.utils import IterableSimpleNamespace, yaml_load
+        from ultralytics.utils.checks import check_yaml
+    except ImportError:
+        # ultralytics 8.0.x
+        from ultralytics.tracker.trackers import BYTETracker
+        from ultralytics.yolo.utils import IterableSimpleNamespace, yaml_load
+        from ultralytics.yolo.utils.checks import check_yaml
+
+    cfg = IterableSimpleNamespace(**yaml_load(check_yaml("bytetrack.yaml")))
+    return BYTETracker(args=cfg, frame_rate=frame_rate)
+
+
+class _Request:
+    __slots__ = ("stream_id", "frame", "conf", "classes", "frame_rate", "offset", "done", "result", "error")
+
+    def __init__(self, stream_id, frame, conf, classes, frame_rate, offset=None):
+        self.stream_id = stream_id
+        self.frame = frame
+        self.conf = conf
+        self.classes = classes
+        self.frame_rate = frame_rate
+        self.offset = offset
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class InferenceEngine:
+    """
+    Um modelo YOLO carregado e compartilhado por várias câmeras.
+
+    Os processadores chamam infer() da sua própria thread; uma thread de
+    inferência junta os frames que chegaram dentro de max_wait (até
+    max_batch) e roda um único forward pass. O tracking (ByteTrack) é feito
+    depois, com um tracker por câmera, para que os IDs não se misturem.
+    """
+
+    def __init__(self, model_path: str, device: str = "cpu", max_batch: int = 8, max_wait: float = 0.01):
+        self.model_path = model_path
+        self.device = device
+        self.max_batch = max(1, int(max_batch))
+        self.max_wait = max(0.0, float(max_wait))
+
+        self.model = None
+        self.refs = 0
+        self.ready = threading.Event()  # setado quando load() termina (com ou sem erro)
+        self.load_error = None
+
+        self._queue = queue.Queue()
+        self._trackers = {}  # stream_id -> BYTETracker
+        self._trackers_lock = threading.Lock()
+        self._running = False
+        self._thread = None
+
+        # métricas
+        self.batches = 0
+        self.frames = 0
+
+    @property
+    def avg_batch_size(self) -> float:
+        return self.frames / self.batches if self.batches else 0.0
+
+    def load(self):
+        from .model_cache import model_cache
+        if self.device == "cpu":
+            torch.set_num_threads(1)
+        # normalmente já aquecido pela validação feita no start do manager
+        self.model = model_cache.get(self.model_path)
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        self._queue.put(None)
+
+    def infer(self, stream_id, frame, conf: float = 0.25, classes=None,
+              frame_rate: int = 30, timeout: float = 10.0, offset=None) -> Detections:
+        """
+        Detecta + rastreia um frame da câmera stream_id.
+
+        offset=(x, y) indica que o frame é um recorte: as caixas são levadas
+        para as coordenadas do frame inteiro antes do tracking, para que o
+        estado do tracker não dependa da posição do recorte.
+        """
+        req = _Request(stream_id, frame, conf, tuple(classes) if classes else None, frame_rate, offset)
+        self._queue.put(req)
+        if not req.done.wait(timeout):
+            raise TimeoutError("Inferência não respondeu a tempo")
+        if req.error is not None:
+            raise req.error
+        return req.result
+
+    def reset_stream(self, stream_id):
+        """Descarta o estado de tracking de uma câmera."""
+        with self._trackers_lock:
+            self._trackers.pop(stream_id, None)
+
+    def _collect_batch(self, first):
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                req = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if req is None:
+                self._running = False
+                break
+            batch.append(req)
+        return batch
+
+    def _loop(self):
+        while self._running:
+            first = self._queue.get()
+            if first is None:
+                break
+            batch = self._collect_batch(first)
+            try:
+                self._run_batch(batch)
+            except Exception as e:
+                # erros de predict/tracking já ficam no próprio request
+                for req in batch:
+                    if req.result is None and req.error is None:
+                        req.error = e
+            finally:
+                for req in batch:
+                    req.done.set()
+
+        # libera quem ainda estiver esperando
+        while True:
+            try:
+                req = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if req is not None:
+                req.error = RuntimeError("Engine de inferência encerrada")
+                req.done.set()
+
+    def _run_batch(self, batch):
+        # predict aceita um único conf/classes por chamada: agrupa por parâmetros
+        groups = defaultdict(list)
+        for req in batch:
+            groups[(req.conf, req.classes)].append(req)
+
+        for (conf, classes), reqs in groups.items():
+            try:
+                results = self.model.predict(
+                    [r.frame for r in reqs],
+                    conf=conf,
+                    classes=list(classes) if classes else None,
+                    device=self.device,
+                    verbose=False,
+                )
+            except Exception as e:
+                # falha só do grupo: as outras câmeras do lote seguem com o resultado delas
+                for req in reqs:
+                    req.error = e
+                continue
+            for req, result in zip(reqs, results):
+                try:
+                    req.result = self._track(req, result)
+                except Exception as e:
+                    req.error = e
+
+        self.batches += 1
+        self.frames += len(batch)
+
+    def _track(self, req, result) -> Detections:
+        boxes = result.boxes.cpu().numpy() if result.boxes is not None else None
+
+        # mesmo critério do model.track: frame sem detecção não atualiza o tracker
+        if boxes is None or len(boxes) == 0:
+            return Detections.empty()
+
+        if req.offset:
+            ox, oy = req.offset
+            boxes.data[:, [0, 2]] += ox
+            boxes.data[:, [1, 3]] += oy
+
+        with self._trackers_lock:
+            tracker = self._trackers.get(req.stream_id)
+            if tracker is None:
+                tracker = self._trackers[req.stream_id] = _make_tracker(req.frame_rate)
+
+        tracks = tracker.update(boxes, req.frame)
+        if len(tracks) == 0:
+            return Detections.empty()
+
+        # linhas: [x1, y1, x2, y2, track_id, score, cls, idx]
+        tracks = np.asarray(tracks)
+        return Detections(
+            xyxy=tracks[:, :4].astype(np.float32),
+            ids=tracks[:, 4].astype(int),
+            cls=tracks[:, 6].astype(int),
+            conf=tracks[:, 5].astype(np.float32),
+        )
+
+
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+def acquire_engine(model_path: str, device: str = "cpu") -> InferenceEngine:
+    """
+    Retorna a engine compartilhada do modelo (carrega na primeira chamada).
+
+    O carregamento roda fora de _engines_lock: a engine entra no registro
+    antes de carregar e quem chega enquanto isso espera só por ela (ready),
+    sem travar acquire/release das outras câmeras.
+    """
+    from django.conf import settings
+
+    key = (str(model_path), device)
+    with _engines_lock:
+        engine = _engines.get(key)
+        owner = engine is None
+        if owner:
+            engine = _engines[key] = InferenceEngine(
+                model_path,
+                device=device,
+                max_batch=getattr(settings, "COUNTER_INFERENCE_MAX_BATCH", 8),
+                max_wait=getattr(settings, "COUNTER_INFERENCE_MAX_WAIT_MS", 10) / 1000.0,
+            )
+        engine.refs += 1
+
+    if owner:
+        try:
+            engine.load()
+            engine.start()
+        except Exception as e:
+            engine.load_error = e
+            with _engines_lock:
+                if _engines.get(key) is engine:
+                    del _engines[key]
+            raise
+        finally:
+            engine.ready.set()
+    else:
+        engine.ready.wait()
+        if engine.load_error is not None:
+            raise engine.load_error
+    return engine
+
+
+def release_engine(engine: InferenceEngine, stream_id=None):
+    """Solta a referência do processador; a última desliga a engine."""
+    with _engines_lock:
+        if stream_id is not None:
+            engine.reset_stream(stream_id)
+        engine.refs -= 1
+        if engine.refs <= 0:
+            engine.stop()
+            key = (str(engine.model_path), engine.device)
+            if _engines.get(key) is engine:
+                del _engines[key]
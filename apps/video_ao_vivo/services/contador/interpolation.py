@@ -0,0 +1,79 @@
+import numpy as np
+
+from .counting import distance_to_polyline
+from .inference import Detections
+
+
+class TrackPredictor:
+    """
+    Propaga as caixas dos tracks entre dois keyframes do detector.
+
+    Guarda, para cada id visto no último keyframe, a caixa e a velocidade
+    (px/s, estimada entre os dois últimos keyframes em que o id apareceu) e
+    extrapola com velocidade constante. Usa o timestamp de captura em vez
+    do índice do frame porque frames podem ser descartados no caminho.
+    """
+
+    def __init__(self, max_extrapolation_s: float = 1.0):
+        self.max_extrapolation_s = max_extrapolation_s
+        self._ids = np.zeros((0,), dtype=int)        # ordenado
+        self._boxes = np.zeros((0, 4), dtype=np.float32)
+        self._vel = np.zeros((0, 4), dtype=np.float32)
+        self._cls = np.zeros((0,), dtype=int)
+        self._conf = np.zeros((0,), dtype=np.float32)
+        self._ts = 0.0
+
+    @property
+    def has_tracks(self) -> bool:
+        return len(self._ids) > 0
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in (self._ids, self._boxes, self._vel, self._cls, self._conf))
+
+    def reset(self):
+        self.__init__(self.max_extrapolation_s)
+
+    def update(self, det: Detections, ts: float):
+        """Registra o resultado de um keyframe."""
+        if det.ids is None or len(det) == 0:
+            self.reset()
+            self._ts = ts
+            return
+
+        order = np.argsort(det.ids)
+        ids = det.ids[order]
+        boxes = det.xyxy[order].astype(np.float32)
+        vel = np.zeros_like(boxes)
+
+        dt = ts - self._ts
+        if len(self._ids) and dt > 0:
+            pos = np.searchsorted(self._ids, ids)
+            pos = np.clip(pos, 0, len(self._ids) - 1)
+            seen = self._ids[pos] == ids
+            vel[seen] = (boxes[seen] - self._boxes[pos[seen]]) / dt
+
+        self._ids, self._boxes, self._vel = ids, boxes, vel
+        self._cls = det.cls[order]
+        self._conf = det.conf[order]
+        self._ts = ts
+
+    def predict(self, ts: float) -> Detections:
+        """Posições estimadas no instante ts (sem rodar o detector)."""
+        if not self.has_tracks:
+            return Detections.empty()
+        dt = min(max(ts - self._ts, 0.0), self.max_extrapolation_s)
+        return Detections(
+            xyxy=self._boxes + self._vel * dt,
+            ids=self._ids.copy(),
+            cls=self._cls.copy(),
+            conf=self._conf.copy(),
+        )
+
+
+def near_line(det: Detections, polyline, margin_px: float) -> bool:
+    """Algum centroide está a menos de margin_px da linha de contagem?"""
+    if len(det) == 0:
+        return False
+    centroids = (det.xyxy[:, :2] + det.xyxy[:, 2:]) / 2.0
+    return bool(np.any(distance_to_polyline(centroids, polyline) <= margin_px))
@@ -1,35 +1,103 @@
 import threading
 from .processor import VideoCounterProcessor
-from collections import deque
+from .model_cache import model_cache
+from .export import resolve_runtime_path
+from .streaming import FrameHub, Notifier
+from .eventlog import CountingEventWriter, JsonlEventLog
+from .events import EventRing
+from .rollups import LiveRollup
+from functools import partial
 import time
-import json
 import os
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timezone as dt_timezone
 from typing import Optional
 from django.conf import settings
 
-class CounterManager:
-    def __init__(self):
+class CameraCounter:
+    """Estado de contagem de uma câmera: processador, sessão, eventos e linha."""
+
+    def __init__(self, camera_id):
+        self.camera_id = camera_id
         self.processor = None
-        self.lock = threading.Lock()
-        self._events = deque(maxlen=300)  # mantém últimos 300 eventos
-        self._event_id = 0
+        # últimos eventos, indexados por id (busca por bisect + long-poll)
+        self.events = EventRing(getattr(settings, "COUNTER_EVENT_BUFFER", 5000))
+        self.rollup = LiveRollup()  # totais por minuto/hora para os gráficos
+        self.event_id = 0
         self.current_session = None
         self.log_file = None
-        self._saved_line_y_norm = 0.5  # Preservar posição da linha entre reinicializações
+        self.event_log = None  # JsonlEventLog da sessão (escrita em background)
+        self.event_writer = None  # CountingEventWriter da sessão (tabela CountingEvent)
+        self.line_y_norm = 0.5  # Preservar posição da linha entre reinicializações
+        self.line_points = None  # linha livre (pontos normalizados), se definida
+        self.lines = []  # linhas nomeadas [{"name", "points"}]
+        self.zones = []  # zonas nomeadas [{"name", "points"}]
+        self.viewers = 0  # clientes conectados no stream MJPEG
+        self.hub = FrameHub()  # preview publicado uma vez para todos os viewers
+        self.changes = Notifier()  # avisa o SSE de eventos/mudanças de status
+        self.lock = threading.Lock()  # serializa start/stop desta câmera
+
+    @property
+    def is_running(self):
+        return bool(self.processor and self.processor.is_running)
+
+
+class CounterManager:
+    """
+    Registro de contadores concorrentes, um por câmera (chave = camera.id).
+
+    Os métodos aceitam camera_id=None para compatibilidade com as rotas
+    antigas de câmera única: nesse caso vale a última câmera iniciada.
+
+    self.lock só protege o registro (ler/trocar entradas); o trabalho lento
+    de start/stop (modelo, banco, threads) roda fora dele, sob o lock da
+    própria câmera, para não travar as outras câmeras nem o status.
+    """
+
+    def __init__(self):
+        self.counters = {}  # camera_id -> CameraCounter
+        self.lock = threading.Lock()
+        self._last_camera_id = None
+
+    def camera_id_for(self, camera_id=None):
+        """camera_id informado ou, sem ele, o da última câmera iniciada (None se nenhuma)."""
+        if camera_id is not None:
+            return int(camera_id)
+        with self.lock:
+            return self._last_camera_id
+
+    def _resolve(self, camera_id=None):
+        """Retorna o CameraCounter da câmera (ou da última iniciada). Chamar com lock."""
+        if camera_id is None:
+            camera_id = self._last_camera_id
+        if camera_id is None:
+            return None
+        return self.counters.get(int(camera_id))
 
     def start(self, camera, user, config=None):
-        """Inicia contador com uma câmera específica"""
+        """Inicia contador com uma câmera específica. Retorna False se já estava rodando."""
         with self.lock:
-            if self.processor and self.processor.is_running:
-                return
+            counter = self.counters.get(camera.id)
+            if counter is None:
+                counter = self.counters[camera.id] = CameraCounter(camera.id)
+        with counter.lock:
+            if counter.is_running:
+                return False
             
-            # Criar sessão no banco
-            self._create_session(camera, user)
+            # sessão anterior que não passou por stop() (processador morreu ou o
+            # start falhou no meio): finaliza sessão e writers antes de abrir outra
+            if counter.processor is not None or counter.current_session is not None:
+                if counter.processor is not None:
+                    counter.processor.stop()
+                self._end_session(counter)
+                with self.lock:
+                    counter.processor = None
             
             # Usar modelo da câmera ou modelo padrão
             model_path, model_config = self._get_model_path_for_camera(camera)
+
+            # Criar sessão no banco
+            self._create_session(counter, camera, user, model_path)
             
             # Criar config se não fornecido
             if config is None:
@@ -41,18 +109,53 @@ class CounterManager:
                     conf_thres=confidence,
                     resize_scale=1.0,
                     device="cpu",
-                    line_y_norm=self._saved_line_y_norm  # Usar posição salva
+                    line_y_norm=counter.line_y_norm  # Usar posição salva
                 )
             else:
                 # Atualizar model_path no config existente
                 config.model_path = model_path
-                config.line_y_norm = self._saved_line_y_norm  # Usar posição salva
+                config.line_y_norm = counter.line_y_norm  # Usar posição salva
+            if counter.line_points:
+                config.line_points = counter.line_points
+            config.lines = counter.lines
+            config.zones = counter.zones
+            
+            # Runtime de inferência (ONNX/OpenVINO se já exportado, senão PyTorch)
+            backend = model_config.runtime_backend if model_config else getattr(settings, "COUNTER_INFERENCE_BACKEND", "torch")
+            config.quantized = bool(getattr(camera, "use_quantized_model", False))
+            config.model_path, config.backend = resolve_runtime_path(model_path, backend, quantized=config.quantized)
+            if config.backend != "torch":
+                config.device = "cpu"
+            
+            # Stride de detecção (1 = detector em todos os frames)
+            config.detect_stride = int(getattr(settings, "COUNTER_DETECT_STRIDE", config.detect_stride))
+            # Faixa de inferência em torno da linha (0 = frame inteiro)
+            config.roi_band = float(getattr(settings, "COUNTER_ROI_BAND", config.roi_band))
+            # Gate de movimento (pula inferência em cena parada)
+            config.motion_gate = bool(getattr(settings, "COUNTER_MOTION_GATE", config.motion_gate))
+            config.motion_threshold = float(getattr(settings, "COUNTER_MOTION_THRESHOLD", config.motion_threshold))
+            # Preview só é desenhado/codificado com viewers conectados (perfil da câmera)
+            config.preview_fps = float(
+                getattr(camera, "preview_fps", None) or getattr(settings, "COUNTER_PREVIEW_FPS", config.preview_fps)
+            )
+            config.preview_max_width = getattr(camera, "preview_max_width", config.preview_max_width)
+            config.preview_jpeg_quality = getattr(camera, "preview_jpeg_quality", config.preview_jpeg_quality)
             
             # Usar URL da câmera
             video_source = camera.primary_url
             
-            self.processor = VideoCounterProcessor(video_source, config, camera)
-            self.processor.start()
+            processor = VideoCounterProcessor(
+                video_source, config, camera,
+                on_event=partial(self.add_event, camera_id=camera.id),
+                on_frame=counter.hub.publish,
+            )
+            with self.lock:
+                counter.processor = processor
+                processor.add_viewer(counter.viewers)
+                self._last_camera_id = camera.id
+            processor.start()
+            counter.changes.bump()
+            return True
     
     def _get_model_path_for_camera(self, camera):
         """Obtém o caminho do modelo para a câmera e retorna (path, model_config)"""
@@ -97,173 +200,398 @@ class CounterManager:
         return "yolov8n.pt", None
     
     def _validate_model(self, model_path):
-        """Valida se o modelo é compatível"""
+        """Valida se o modelo é compatível (carrega uma vez e reaproveita o cache)"""
         try:
-            # Verificar se o arquivo existe
-            if not os.path.exists(model_path):
-                return False
-            
-            from ultralytics import YOLO
-            # Tenta carregar o modelo para verificar compatibilidade
-            model = YOLO(model_path)
-            del model  # Libera memória
-            return True
+            return model_cache.validate(model_path)
         except Exception:
             return False
 
-    def pause(self):
+    def pause(self, camera_id=None):
         with self.lock:
-            if self.processor: self.processor.pause()
+            counter = self._resolve(camera_id)
+            if counter and counter.processor:
+                counter.processor.pause()
+                counter.changes.bump()
 
     #def add_event(self, kind: str, delta: int, track_id: int | None = None):]
-    def add_event(self, kind: str, delta: int, track_id: Optional[int] = None):
-        # kind: "IN" ou "OUT"
-        self._event_id += 1
+    def add_event(self, kind: str, delta: int, track_id: Optional[int] = None, camera_id=None,
+                  line: Optional[str] = None, zone: Optional[str] = None,
+                  class_name: Optional[str] = None):
+        # kind: "IN"/"OUT" (linha principal ou `line`) ou "ENTER"/"EXIT" (`zone`)
+        counter = self.counters.get(camera_id) if camera_id is not None else self._resolve()
+        if counter is None:
+            return
+        counter.event_id += 1
         event = {
-            "id": self._event_id,
+            "id": counter.event_id,
             "ts": time.time(),
             "kind": kind,
             "delta": delta,
             "track_id": track_id,
+            "camera_id": counter.camera_id,
         }
-        self._events.append(event)
+        if class_name is not None:
+            event["class_name"] = class_name
+        if line is not None:
+            event["line"] = line
+        if zone is not None:
+            event["zone"] = zone
+        counter.events.append(event)
+        if line is None and zone is None:
+            counter.rollup.add(event["ts"], kind, delta, class_name)
+        counter.changes.bump()
         
         # Salvar no log
-        self._log_event(event)
+        self._log_event(counter, event)
+
+    def get_events_after(self, after_id: int, camera_id=None):
+        counter = self._resolve(camera_id)
+        if counter is None:
+            return []
+        return counter.events.after(after_id)[0]
 
-    def get_events_after(self, after_id: int):
-        return [e for e in self._events if e["id"] > after_id]
+    def rollup_series(self, granularity: str = "minute", n: int = 10, camera_id=None, class_name=None):
+        """
+        Totais IN/OUT das últimas n janelas ("minute" ou "hour") da linha principal.
+
+        Sem camera_id soma todas as câmeras (painéis gerais).
+        """
+        now = time.time()
+        with self.lock:
+            if camera_id is None:
+                counters = list(self.counters.values())
+            else:
+                counters = [c for c in (self.counters.get(int(camera_id)),) if c]
+        total = LiveRollup().series(granularity, n, now)  # janelas zeradas
+        for counter in counters:
+            for bucket, counts in zip(total, counter.rollup.series(granularity, n, now, class_name)):
+                bucket["in"] += counts["in"]
+                bucket["out"] += counts["out"]
+        return total
 
-    def resume(self):
+    def resume(self, camera_id=None):
         with self.lock:
-            if self.processor: self.processor.resume()
+            counter = self._resolve(camera_id)
+            if counter and counter.processor:
+                counter.processor.resume()
+                counter.changes.bump()
+
+    # Informações da contagem que o usuário pode preencher ao parar
+    SESSION_INFO_FIELDS = ("animal_type", "batch_number", "recipient", "additional_notes")
+
+    def stop(self, camera_id=None, session_info: Optional[dict] = None):
+        """
+        Para o contador e retorna a sessão finalizada (ou None).
 
-    def stop(self):
+        session_info (animal_type, batch_number, ...) é gravado na sessão antes
+        dos totais agregados, para o tipo de animal entrar nos rollups.
+        """
         with self.lock:
-            if self.processor: 
-                self.processor.stop()
+            counter = self._resolve(camera_id)
+        if counter is None:
+            return None
+        with counter.lock:
+            session = counter.current_session
+            processor = counter.processor
+            if processor:
+                processor.stop()
                 # Finalizar sessão
-                self._end_session()
-            self.processor = None
+                self._end_session(counter, session_info)
+            with self.lock:
+                counter.processor = None
+            counter.hub.clear()
+            counter.changes.bump()
+            return session
+
+    def stop_all(self):
+        for camera_id in list(self.counters):
+            self.stop(camera_id)
     
-    def _create_session(self, camera, user):
+    def _create_session(self, counter, camera, user, model_path):
         """Cria sessão de contagem e arquivo de log"""
         from apps.video_ao_vivo.models import CountingSession
         
-        # Obter caminho do modelo e converter para relativo
-        model_path, model_config = self._get_model_path_for_camera(camera)
+        # Converter caminho do modelo para relativo
         relative_model_path = self._get_relative_path(model_path)
         
         # Criar sessão no banco
-        self.current_session = CountingSession.objects.create(
+        counter.current_session = CountingSession.objects.create(
             user=user,
             camera=camera,
-            model_used=relative_model_path
+            model_used=relative_model_path,
+            line_y_norm=counter.line_y_norm
         )
         
         # Criar arquivo de log
         logs_dir = Path(settings.MEDIA_ROOT) / "counting_logs"
         logs_dir.mkdir(exist_ok=True)
         
-        log_filename = f"session_{self.current_session.id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-        self.log_file = logs_dir / log_filename
+        log_filename = f"session_{counter.current_session.id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+        counter.log_file = logs_dir / log_filename
         
         # Salvar apenas o caminho relativo ao MEDIA_ROOT
         relative_path = f"counting_logs/{log_filename}"
-        self.current_session.log_file_path = relative_path
-        self.current_session.save()
-        
-        # Inicializar arquivo de log
-        log_data = {
-            "session_id": self.current_session.id,
-            "camera_id": camera.id,
-            "camera_name": camera.name,
-            "user_id": user.id,
-            "started_at": datetime.now().isoformat(),
-            "events": []
-        }
+        counter.current_session.log_file_path = relative_path
+        counter.current_session.save()
         
-        with open(self.log_file, 'w') as f:
-            json.dump(log_data, f, indent=2)
+        # Inicializar arquivo de log (cabeçalho; eventos são anexados em background)
+        counter.event_log = JsonlEventLog(counter.log_file)
+        counter.event_log.header(
+            session_id=counter.current_session.id,
+            camera_id=camera.id,
+            camera_name=camera.name,
+            user_id=user.id,
+            started_at=datetime.now().isoformat(),
+        )
+        counter.event_writer = CountingEventWriter()
     
-    def _end_session(self):
-        """Finaliza sessão salvando totais"""
-        if not self.current_session or not self.processor:
+    def _end_session(self, counter, session_info: Optional[dict] = None):
+        """Finaliza sessão salvando totais e somando nos rollups por hora/dia"""
+        if not counter.current_session:
             return
         
+        from django.db import transaction
         from django.utils import timezone
+        from apps.video_ao_vivo.models import CountingRollup
+        
+        session = counter.current_session
+        processor = counter.processor  # None se o start falhou depois de criar a sessão
+        counts = processor.counts if processor else {}
+        class_counts = processor.class_counts if processor else {}
         
         # Atualizar sessão com totais finais
-        self.current_session.ended_at = timezone.now()
-        self.current_session.total_in = self.processor.counts.get("in", 0)
-        self.current_session.total_out = self.processor.counts.get("out", 0)
-        self.current_session.balance = self.current_session.total_in - self.current_session.total_out
-        self.current_session.save()
+        session.ended_at = timezone.now()
+        session.total_in = counts.get("in", 0)
+        session.total_out = counts.get("out", 0)
+        session.balance = session.total_in - session.total_out
+        session.class_totals = {name: dict(c) for name, c in class_counts.items()}
+        for field in self.SESSION_INFO_FIELDS:
+            if session_info and field in session_info:
+                setattr(session, field, session_info[field])
+        try:
+            with transaction.atomic():
+                session.save()
+                CountingRollup.record_session(session)
+        except Exception as e:
+            print(f"Erro ao finalizar sessão {session.id}: {e}")
         
-        # Finalizar log
-        if self.log_file and self.log_file.exists():
-            try:
-                with open(self.log_file, 'r') as f:
-                    log_data = json.load(f)
-                
-                log_data["ended_at"] = timezone.now().isoformat()
-                log_data["total_in"] = self.current_session.total_in
-                log_data["total_out"] = self.current_session.total_out
-                log_data["balance"] = self.current_session.balance
-                
-                with open(self.log_file, 'w') as f:
-                    json.dump(log_data, f, indent=2)
-            except Exception as e:
-                print(f"Erro ao finalizar log: {e}")
+        # Finalizar log: rodapé com os totais e descarga do que estiver na fila
+        if counter.event_log:
+            footer = {
+                "ended_at": timezone.now().isoformat(),
+                "total_in": session.total_in,
+                "total_out": session.total_out,
+                "balance": session.balance,
+                "class_totals": session.class_totals,
+            }
+            regions = processor.region_counts() if processor else {}
+            if regions.get("lines") or regions.get("zones"):
+                footer["regions"] = regions
+            counter.event_log.footer(**footer)
+            counter.event_log.close()
+            if counter.event_log.dropped:
+                print(f"Log da sessão {session.id}: {counter.event_log.dropped} eventos descartados")
         
-        self.current_session = None
-        self.log_file = None
+        if counter.event_writer:
+            counter.event_writer.close()
+        
+        counter.current_session = None
+        counter.log_file = None
+        counter.event_log = None
+        counter.event_writer = None
 
-    def status(self):
+    def _counter_status(self, counter):
+        processor = counter.processor if counter else None
+        if not processor:
+            return {"running": False, "paused": False, "in": 0, "out": 0,
+                    "camera_id": counter.camera_id if counter else None}
+
+        return {
+            "camera_id": counter.camera_id,
+            "session_id": counter.current_session.id if counter.current_session else None,
+            "running": processor.is_running,
+            "paused": processor.is_paused,
+            "in": int(processor.counts.get("in", 0)),
+            "out": int(processor.counts.get("out", 0)),
+            "classes": {name: dict(c) for name, c in processor.class_counts.items()},
+            "line_y_norm": processor.line_y_norm,
+            "line_points": processor.line_points,
+            "frames_processed": processor.frames_processed,
+            "frames_dropped": processor.frames_dropped,
+            "latency_ms": round(processor.latency_ms, 1),
+            "detector_calls": processor.detector_calls,
+            "detect_stride": processor._current_stride,
+            "motion": processor.motion_state,
+            "frames_idle": processor.frames_idle,
+            "tracks": len(processor._crossings),
+            "tracks_evicted": processor._crossings.evicted,
+            "memory_kb": round(processor.memory_bytes / 1024, 1),
+            "viewers": counter.viewers,
+            "log_dropped": counter.event_log.dropped if counter.event_log else 0,
+            "db_dropped": counter.event_writer.dropped if counter.event_writer else 0,
+            "preview_encoder": processor._encoder.backend,
+            **processor.region_counts(),
+        }
+
+    def status(self, camera_id=None):
         with self.lock:
-            if not self.processor:
-                return {"running": False, "paused": False, "in": 0, "out": 0}
-
-            return {
-                "running": self.processor.is_running,
-                "paused": self.processor.is_paused,
-                "in": int(self.processor.counts.get("in", 0)),
-                "out": int(self.processor.counts.get("out", 0)),
-            }
+            return self._counter_status(self._resolve(camera_id))
 
+    def status_all(self):
+        with self.lock:
+            return [self._counter_status(c) for c in self.counters.values() if c.processor]
 
-    def set_line_y_norm(self, y_norm: float):
+    def set_line_y_norm(self, y_norm: float, camera_id=None):
+        """Move a linha horizontal; retorna a posição gravada (None se não há câmera)."""
+        counter = self._get_or_create(camera_id)
+        if counter is None:
+            return None
         with self.lock:
             # Salvar a posição para preservar entre reinicializações
-            self._saved_line_y_norm = max(0.0, min(1.0, float(y_norm)))
-            if self.processor:
-                self.processor.set_line_y_norm(self._saved_line_y_norm)
+            counter.line_y_norm = max(0.0, min(1.0, float(y_norm)))
+            counter.line_points = None
+            if counter.processor:
+                counter.processor.set_line_y_norm(counter.line_y_norm)
+                return counter.processor.line_y_norm
+            return counter.line_y_norm
 
-    def get_latest_jpeg(self):
+    def set_line_points(self, points, camera_id=None):
+        """
+        Define linha livre (segmento/polilinha) com pontos normalizados 0..1.
+
+        Retorna os pontos gravados, já limitados a 0..1 (None se não há câmera).
+        """
+        points = [(max(0.0, min(1.0, float(x))), max(0.0, min(1.0, float(y)))) for x, y in points]
+        if len(points) < 2:
+            raise ValueError("A linha precisa de pelo menos 2 pontos")
+        counter = self._get_or_create(camera_id)
+        if counter is None:
+            return None
         with self.lock:
-            return self.processor.latest_jpeg if self.processor else None
-    
-    def _log_event(self, event):
-        """Salva evento no arquivo de log"""
-        if not self.log_file or not self.log_file.exists():
+            counter.line_points = points
+            if counter.processor:
+                counter.processor.set_line_points(points)
+                return counter.processor.line_points
+            return counter.line_points
+
+    @staticmethod
+    def _parse_regions(items, min_points: int):
+        """Valida [{"name", "points"}] e normaliza os pontos para 0..1."""
+        regions, names = [], set()
+        for item in items or []:
+            name = str(item.get("name", "")).strip()
+            if not name or name in names:
+                raise ValueError(f"Nome de região inválido ou repetido: {name!r}")
+            points = [(max(0.0, min(1.0, float(x))), max(0.0, min(1.0, float(y)))) for x, y in item.get("points", [])]
+            if len(points) < min_points:
+                raise ValueError(f"Região {name!r} precisa de pelo menos {min_points} pontos")
+            names.add(name)
+            regions.append({"name": name, "points": points})
+        return regions
+
+    def set_regions(self, lines=None, zones=None, camera_id=None):
+        """Define as linhas/zonas nomeadas da câmera (None mantém as atuais)."""
+        lines = self._parse_regions(lines, 2) if lines is not None else None
+        zones = self._parse_regions(zones, 3) if zones is not None else None
+        counter = self._get_or_create(camera_id)
+        if counter is None:
             return
-        
-        try:
-            with open(self.log_file, 'r') as f:
-                log_data = json.load(f)
-            
-            log_data["events"].append({
-                "timestamp": datetime.fromtimestamp(event["ts"]).isoformat(),
+        with self.lock:
+            if lines is not None:
+                counter.lines = lines
+            if zones is not None:
+                counter.zones = zones
+            if counter.processor:
+                counter.processor.set_regions(lines, zones)
+
+    def add_viewer(self, camera_id=None, delta: int = 1):
+        """Conta clientes do stream; o preview só é gerado enquanto houver algum."""
+        with self.lock:
+            counter = self._resolve(camera_id)
+            if counter is None:
+                return
+            counter.viewers = max(0, counter.viewers + delta)
+            if counter.processor:
+                counter.processor.add_viewer(delta)
+
+    def remove_viewer(self, camera_id=None):
+        self.add_viewer(camera_id, delta=-1)
+
+    def _get_or_create(self, camera_id=None):
+        """
+        Contador da câmera; só cria para ids que existem em Camera (None caso contrário).
+
+        Consulta o banco: usar só a partir das views síncronas de configuração
+        (linha/regiões). O caminho de stream/status usa _get, sem ORM.
+        """
+        counter = self._get(camera_id)
+        if counter is not None or camera_id is None:
+            return counter
+        from apps.cameras.models import Camera
+
+        camera_id = int(camera_id)
+        if not Camera.objects.filter(pk=camera_id).exists():
+            return None
+        with self.lock:
+            counter = self.counters.get(camera_id)
+            if counter is None:
+                counter = self.counters[camera_id] = CameraCounter(camera_id)
+            return counter
+
+    def _get(self, camera_id=None):
+        with self.lock:
+            return self._resolve(camera_id)
+
+    def get_hub(self, camera_id=None):
+        """Hub do preview da câmera (None se a câmera ainda não tem contador)."""
+        counter = self._get(camera_id)
+        return counter.hub if counter else None
+
+    def get_notifier(self, camera_id=None):
+        """Notifier de eventos/status da câmera (None se a câmera ainda não tem contador)."""
+        counter = self._get(camera_id)
+        return counter.changes if counter else None
+
+    def get_event_ring(self, camera_id=None):
+        """Buffer de eventos da câmera, para long-poll (None se a câmera ainda não tem contador)."""
+        counter = self._get(camera_id)
+        return counter.events if counter else None
+
+    def get_latest_jpeg(self, camera_id=None):
+        with self.lock:
+            counter = self._resolve(camera_id)
+            return counter.processor.latest_jpeg if counter and counter.processor else None
+    
+    def _log_event(self, counter, event):
+        """Enfileira o evento no log da sessão e no banco (gravados em lote por outra thread)"""
+        session = counter.current_session
+        event_writer = counter.event_writer
+        if session is not None and event_writer is not None:
+            event_writer.submit({
+                "session_id": session.id,
+                "camera_id": counter.camera_id,
+                "ts": datetime.fromtimestamp(event["ts"], tz=dt_timezone.utc),
                 "kind": event["kind"],
+                "delta": event["delta"],
                 "track_id": event["track_id"],
-                "delta": event["delta"]
+                "class_name": event.get("class_name"),
+                "region": event.get("line") or event.get("zone"),
             })
-            
-            with open(self.log_file, 'w') as f:
-                json.dump(log_data, f, indent=2)
-                
-        except Exception as e:
-            print(f"Erro ao salvar evento no log: {e}")
+        
+        event_log = counter.event_log
+        if event_log is None:
+            return
+        
+        record = {
+            "timestamp": datetime.fromtimestamp(event["ts"]).isoformat(),
+            "kind": event["kind"],
+            "track_id": event["track_id"],
+            "delta": event["delta"],
+        }
+        for key in ("class_name", "line", "zone"):
+            if key in event:
+                record[key] = event[key]
+        event_log.event(**record)
     
     def _get_relative_path(self, absolute_path):
         """Converte caminho absoluto para relativo"""
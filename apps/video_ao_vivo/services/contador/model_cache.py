@@ -0,0 +1,153 @@
+import os
+import threading
+from collections import OrderedDict
+
+
+class _Entry:
+    __slots__ = ("model", "size_bytes")
+
+    def __init__(self, model, size_bytes):
+        self.model = model
+        self.size_bytes = size_bytes
+
+
+class ModelCache:
+    """
+    Cache de processo dos modelos YOLO carregados.
+
+    A chave é (caminho absoluto, mtime, tamanho): substituir o arquivo .pt
+    invalida a entrada sem precisar de hash do conteúdo. Os modelos ficam em
+    LRU limitado por um orçamento de memória; os metadados (classes, tarefa)
+    continuam guardados mesmo depois que o modelo sai do cache, então a
+    validação de um modelo já visto não recarrega os pesos.
+    """
+
+    def __init__(self, budget_mb: float = 1024):
+        self.budget_bytes = int(budget_mb * 1024 * 1024)
+        self._entries = OrderedDict()  # key -> _Entry
+        self._metadata = {}            # key -> dict
+        self._lock = threading.Lock()
+        self._load_locks = {}          # key -> Lock (evita carregar o mesmo modelo 2x)
+
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(model_path: str):
+        path = os.path.abspath(str(model_path))
+        try:
+            st = os.stat(path)
+            return (path, st.st_mtime_ns, st.st_size)
+        except OSError:
+            # ex: "yolov8n.pt", baixado automaticamente pelo ultralytics
+            return (str(model_path), 0, 0)
+
+    @staticmethod
+    def _estimate_size(model, model_path: str) -> int:
+        try:
+            return sum(p.numel() * p.element_size() for p in model.model.parameters())
+        except Exception:
+            # modelos exportados (ONNX = arquivo, OpenVINO = diretório)
+            if os.path.isdir(model_path):
+                return sum(
+                    os.path.getsize(os.path.join(root, name))
+                    for root, _, files in os.walk(model_path) for name in files
+                )
+            try:
+                return os.path.getsize(model_path)
+            except OSError:
+                return 0
+
+    @property
+    def used_bytes(self) -> int:
+        return sum(e.size_bytes for e in self._entries.values())
+
+    def get(self, model_path: str):
+        """Retorna o modelo carregado (carrega e guarda no cache se preciso)."""
+        key = self._key(model_path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.model
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        with load_lock:
+            # outra thread pode ter carregado enquanto esperávamos
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry.model
+
+            from .processor import YOLO
+            if YOLO is None:
+                raise RuntimeError("YOLO não disponível")
+            model = YOLO(str(model_path))
+            size = self._estimate_size(model, str(model_path))
+
+            with self._lock:
+                self.misses += 1
+                self._entries[key] = _Entry(model, size)
+                self._metadata[key] = {
+                    "names": dict(getattr(model, "names", {}) or {}),
+                    "task": getattr(model, "task", None),
+                    "size_bytes": size,
+                }
+                self._evict(keep=key)
+                self._load_locks.pop(key, None)
+            return model
+
+    def metadata(self, model_path: str):
+        """Metadados do modelo (None se não puder ser carregado)."""
+        key = self._key(model_path)
+        with self._lock:
+            meta = self._metadata.get(key)
+        if meta is not None:
+            return meta
+        try:
+            self.get(model_path)
+        except Exception:
+            return None
+        with self._lock:
+            return self._metadata.get(key)
+
+    def validate(self, model_path: str) -> bool:
+        if not os.path.exists(model_path):
+            return False
+        return self.metadata(model_path) is not None
+
+    def _evict(self, keep=None):
+        """Remove os menos usados até caber no orçamento. Chamar com lock."""
+        total = self.used_bytes
+        for key in list(self._entries):
+            if total <= self.budget_bytes:
+                break
+            if key == keep:
+                continue
+            total -= self._entries.pop(key).size_bytes
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._metadata.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "models": len(self._entries),
+                "used_mb": round(self.used_bytes / (1024 * 1024), 1),
+                "budget_mb": round(self.budget_bytes / (1024 * 1024), 1),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+def _build_cache():
+    from django.conf import settings
+    return ModelCache(budget_mb=getattr(settings, "COUNTER_MODEL_CACHE_MB", 1024))
+
+
+model_cache = _build_cache()
@@ -0,0 +1,69 @@
+import cv2
+import numpy as np
+
+
+class MotionGate:
+    """
+    Detector de movimento barato para pular a inferência em cena parada.
+
+    Compara cada frame (reduzido e em cinza) com o anterior dentro da região
+    de contagem. Havendo movimento o gate fica "active" por hold_frames
+    frames, para o detector acompanhar o objeto até ele parar/sair.
+    """
+
+    def __init__(self, threshold: float = 0.005, pixel_delta: int = 25,
+                 hold_frames: int = 30, width: int = 160):
+        self.threshold = threshold      # fração mínima de pixels alterados
+        self.pixel_delta = pixel_delta  # diferença de intensidade que conta como mudança
+        self.hold_frames = hold_frames
+        self.width = width
+
+        self._prev = None
+        self._hold = 0
+        self.motion_ratio = 0.0
+
+    @property
+    def state(self) -> str:
+        return "active" if self._hold > 0 else "idle"
+
+    def reset(self):
+        self._prev = None
+        self._hold = 0
+
+    def check(self, frame, region=None) -> bool:
+        """
+        Atualiza o gate com um frame BGR; True = rodar o detector.
+
+        region=(y0, y1) normalizado 0..1 restringe a análise à faixa de contagem
+        (valores fora de 0..1, com a linha perto da borda, são limitados ao frame).
+        """
+        h, w = frame.shape[:2]
+        small_h = max(1, int(h * self.width / w))
+        gray = cv2.cvtColor(cv2.resize(frame, (self.width, small_h), interpolation=cv2.INTER_AREA),
+                            cv2.COLOR_BGR2GRAY)
+        gray = cv2.GaussianBlur(gray, (5, 5), 0)
+        if region is not None:
+            r0 = min(max(float(region[0]), 0.0), 1.0)
+            r1 = min(max(float(region[1]), 0.0), 1.0)
+            y0 = min(int(r0 * small_h), small_h - 1)
+            y1 = max(y0 + 1, int(r1 * small_h))
+            gray = gray[y0:y1]
+        if gray.size == 0:
+            # nada para comparar: não arrisca perder contagem, roda o detector
+            self._prev = None
+            self._hold = self.hold_frames
+            return True
+
+        prev, self._prev = self._prev, gray
+        if prev is None or prev.shape != gray.shape:
+            # sem referência (início ou linha movida): assume movimento
+            self._hold = self.hold_frames
+            return True
+
+        changed = np.count_nonzero(cv2.absdiff(gray, prev) > self.pixel_delta)
+        self.motion_ratio = changed / gray.size
+        if self.motion_ratio >= self.threshold:
+            self._hold = self.hold_frames
+        elif self._hold > 0:
+            self._hold -= 1
+        return self._hold > 0
@@ -1,4 +1,6 @@
 import cv2
+import logging
+import numpy as np
 import time
 import threading
 import torch
@@ -6,6 +8,13 @@ import os
 import signal
 import sys
 
+from .capture import FrameGrabber
+from .counting import CrossingCounter, ZoneCounter, values_for
+from .encoder import JpegEncoder, fit_width
+from .inference import Detections, acquire_engine, release_engine
+from .interpolation import TrackPredictor, near_line
+from .motion import MotionGate
+
 # Configurações críticas para produção
 os.environ['YOLO_VERBOSE'] = 'False'
 os.environ['ULTRALYTICS_SETTINGS'] = '{}'
@@ -30,47 +39,79 @@ except ImportError:
     YOLO = None
     signal.signal = original_signal
 
+logger = logging.getLogger(__name__)
+
 class VideoCounterProcessor:
     """
-    Conta IN/OUT quando o centroide do objeto cruza uma linha horizontal.
+    Conta IN/OUT quando o centroide do objeto cruza a linha de contagem
+    (horizontal em line_y_norm, ou segmento/polilinha livre).
     Usa YOLO + tracking (ByteTrack) para manter IDs.
     """
 
-    def __init__(self, video_path: str, config, camera=None):
+    def __init__(self, video_path: str, config, camera=None, on_event=None, on_frame=None):
         self.video_path = str(video_path)
         self.config = config
         self.camera = camera  # Referência da câmera
+        # callback(kind, delta, track_id=...) chamado a cada cruzamento
+        self.on_event = on_event
+        # callback(jpeg) chamado a cada frame de preview codificado
+        self.on_frame = on_frame
 
         self.is_running = False
         self.is_paused = False
 
         self.latest_jpeg = None
         self.counts = {"in": 0, "out": 0}
+        # mesma contagem da linha principal separada por classe: {"pig": {"in", "out"}}
+        self.class_counts = {}
+        self.class_names = {}  # id -> nome (do modelo carregado)
 
         self._thread = None
         self._lock = threading.Lock()
 
-        self.cap = None
+        self._grabber = None
         self.fps = 30.0
 
+        # métricas do estágio de captura
+        self.frames_processed = 0
+        self.frames_dropped = 0     # frames descartados por estarem desatualizados
+        self.latency_ms = 0.0       # captura -> fim do processamento do último frame
+
         # linha vinda do front (0..1)
         self.line_y_norm = getattr(config, "line_y_norm", 0.5)
-        print(f"Processor inicializado com linha: {self.line_y_norm}")
-
-        # YOLO model - inicializar apenas quando necessário
-        self.model = None
+        # linha livre: lista de pontos (x,y) normalizados; None = horizontal em line_y_norm
+        self.line_points = getattr(config, "line_points", None)
+        p1, p2 = getattr(config, "line_p1", None), getattr(config, "line_p2", None)
+        if self.line_points is None and p1 is not None and p2 is not None:
+            self.line_points = [p1, p2]
+        print(f"Processor inicializado com linha: {self.line_points or self.line_y_norm}")
+
+        # modelo carregado pela engine de inferência compartilhada
+        self._engine = None
         self.model_path = self.config.model_path
-
-        # memória para contagem por ID
-        self._last_side_by_id = {}      # id -> -1 (acima) / +1 (abaixo)
-        self._counted_recently = {}     # id -> cooldown frames
+        self.device = getattr(config, "device", "cpu")
+        # chave do estado de tracking desta câmera dentro da engine
+        self._stream_id = camera.id if camera is not None else id(self)
+
+        # memória para contagem por ID (lado da linha + debounce)
+        # ajuste: cooldown permite “debounce” (evita contar várias vezes no mesmo bicho)
+        self._crossings = CrossingCounter(
+            cooldown_frames=20,
+            max_tracks=int(getattr(config, "max_tracks", 5000)),
+        )
+        # ids não vistos há track_ttl_s segundos são descartados
+        self.track_ttl_s = float(getattr(config, "track_ttl_s", 30.0))
         self._frame_idx = 0
 
-        # ajuste: permite “debounce” (evita contar várias vezes no mesmo bicho)
-        self._cooldown_frames = 20
+        # linhas e zonas nomeadas, avaliadas sobre as mesmas detecções/tracks
+        self.lines = {}  # nome -> {"points", "counter", "counts"}
+        self.zones = {}
+        self.set_regions(getattr(config, "lines", None) or [], getattr(config, "zones", None) or [])
 
-        # Usar classe específica da câmera se disponível
-        if camera and hasattr(camera, 'detection_class'):
+        # Usar as classes da câmera (principal + adicionais) se disponível
+        if camera and hasattr(camera, 'counting_classes'):
+            self.classes = camera.counting_classes
+        elif camera and hasattr(camera, 'detection_class'):
             self.classes = [camera.detection_class]  # Apenas a classe da câmera
         else:
             self.classes = getattr(config, "classes", None)  # ex: [0] ou None
@@ -81,16 +122,124 @@ class VideoCounterProcessor:
         # resize
         self.resize_scale = float(getattr(config, "resize_scale", 1.0))
 
+        # stride de detecção: entre keyframes as posições vêm do predictor
+        self.detect_stride = max(1, int(getattr(config, "detect_stride", 1)))
+        self.stride_line_margin = float(getattr(config, "stride_line_margin", 0.15))
+        self._predictor = TrackPredictor()
+        self._current_stride = 1
+        self._frames_since_detect = 0
+        self.detector_calls = 0
+
+        # faixa de inferência em torno da linha (0 = frame inteiro)
+        self.roi_band = float(getattr(config, "roi_band", 0.0))
+
+        # gate de movimento: cena parada não passa pelo detector
+        self._motion_gate = None
+        if getattr(config, "motion_gate", False):
+            self._motion_gate = MotionGate(
+                threshold=float(getattr(config, "motion_threshold", 0.005)),
+                hold_frames=int(getattr(config, "motion_hold_frames", 30)),
+            )
+        self.frames_idle = 0
+
+        # preview: anotação + JPEG só com alguém assistindo, em thread própria
+        self.preview_fps = float(getattr(config, "preview_fps", 10.0))
+        self.preview_max_width = int(getattr(config, "preview_max_width", 0) or 0)
+        self._encoder = JpegEncoder(quality=getattr(config, "preview_jpeg_quality", 75))
+        self.viewers = 0
+        self._viewers_changed = threading.Event()
+        self._snapshot = None  # último frame processado + o que desenhar nele
+        self._render_thread = None
+
     def set_line_y_norm(self, y_norm: float):
         with self._lock:
             old_value = self.line_y_norm
             self.line_y_norm = max(0.0, min(1.0, float(y_norm)))
+            self.line_points = None
             print(f"Linha atualizada: {old_value} -> {self.line_y_norm}")
 
+    def set_line_points(self, points):
+        """Linha livre (segmento ou polilinha) em coordenadas normalizadas."""
+        with self._lock:
+            self.line_points = [(float(x), float(y)) for x, y in points]
+            print(f"Linha atualizada: {self.line_points}")
+
+    def set_regions(self, lines=None, zones=None):
+        """
+        Define linhas/zonas nomeadas: listas de {"name", "points"} normalizados.
+
+        Uma região que já existia com o mesmo nome mantém seus contadores.
+        """
+        main = self._crossings
+        with self._lock:
+            if lines is not None:
+                current = self.lines
+                self.lines = {}
+                for item in lines:
+                    region = current.get(item["name"]) or {
+                        "counter": CrossingCounter(main.cooldown_frames, main.ttl_frames, main.max_tracks),
+                        "counts": {"in": 0, "out": 0},
+                    }
+                    region["points"] = [tuple(p) for p in item["points"]]
+                    self.lines[item["name"]] = region
+            if zones is not None:
+                current = self.zones
+                self.zones = {}
+                for item in zones:
+                    region = current.get(item["name"]) or {
+                        "counter": ZoneCounter(main.ttl_frames, main.max_tracks),
+                        "counts": {"in": 0, "out": 0},
+                    }
+                    region["points"] = [tuple(p) for p in item["points"]]
+                    self.zones[item["name"]] = region
+
+    def region_counts(self):
+        """Contadores por linha/zona nomeada (status)."""
+        with self._lock:
+            return {
+                "lines": {name: dict(r["counts"]) for name, r in self.lines.items()},
+                "zones": {
+                    name: dict(r["counts"], occupancy=r["counter"].occupancy)
+                    for name, r in self.zones.items()
+                },
+            }
+
+    def _class_name(self, cls_id: int) -> str:
+        return str(self.class_names.get(cls_id, cls_id))
+
+    def _count_main(self, kind: str, tid: int, cls_id: int):
+        """Cruzamento da linha principal: total, total da classe e evento."""
+        key = kind.lower()
+        name = self._class_name(cls_id)
+        self.counts[key] += 1
+        per_class = self.class_counts.setdefault(name, {"in": 0, "out": 0})
+        per_class[key] += 1
+        logger.debug("%s: ID %d (%s) cruzou linha - Total %s: %d", kind, tid, name, kind, self.counts[key])
+        self._emit_event(kind, +1 if kind == "IN" else -1, tid, class_name=name)
+
+    def _track_tables(self):
+        yield self._crossings
+        for region in list(self.lines.values()) + list(self.zones.values()):
+            yield region["counter"]
+
+    def _line_norm(self):
+        """Pontos da linha de contagem normalizados (chamar com lock)."""
+        if self.line_points:
+            return self.line_points
+        return [(0.0, self.line_y_norm), (1.0, self.line_y_norm)]
+
     def start(self):
         self.is_running = True
         self._thread = threading.Thread(target=self._loop, daemon=True)
         self._thread.start()
+        self._render_thread = threading.Thread(target=self._render_loop, daemon=True)
+        self._render_thread.start()
+
+    def add_viewer(self, delta: int = 1):
+        """Registra (ou remove, com delta negativo) um cliente do stream."""
+        with self._lock:
+            self.viewers = max(0, self.viewers + delta)
+        self._viewers_changed.set()
 
     def pause(self):
         self.is_paused = True
@@ -98,14 +247,144 @@ class VideoCounterProcessor:
     def resume(self):
         self.is_paused = False
 
-    def stop(self):
+    def stop(self, timeout: float = 10.0):
+        """Sinaliza o fim e espera as threads: depois disso nenhum evento é emitido."""
         self.is_running = False
-        if self.cap:
-            self.cap.release()
+        self._viewers_changed.set()
+        if self._grabber:
+            self._grabber.stop()
+        for thread in (self._thread, self._render_thread):
+            if thread is not None and thread is not threading.current_thread():
+                thread.join(timeout)
+                if thread.is_alive():
+                    print(f"Thread {thread.name} do processador não terminou em {timeout}s")
+
+    def _emit_event(self, kind: str, delta: int, track_id: int, **extra):
+        if self.on_event is None:
+            return
+        try:
+            self.on_event(kind, delta, track_id=track_id, **extra)
+        except Exception as e:
+            print(f"Erro ao registrar evento {kind}: {e}")
+
+    @property
+    def memory_bytes(self) -> int:
+        """Estimativa do estado mantido pelo processador (tracks + preview)."""
+        tables = sum(t.nbytes for t in self._track_tables())
+        return tables + self._predictor.nbytes + len(self.latest_jpeg or b"")
+
+    @property
+    def motion_state(self) -> str:
+        return self._motion_gate.state if self._motion_gate else "active"
+
+    def _roi(self, frame, line_top: int, line_bottom: int):
+        """Recorta a faixa de contagem; retorna (recorte, y do topo no frame)."""
+        if not 0.0 < self.roi_band < 1.0:
+            return frame, 0
+        h = frame.shape[0]
+        half = max(16, int(self.roi_band * h / 2))
+        y0 = max(0, line_top - half)
+        y1 = min(h, line_bottom + half)
+        return frame[y0:y1], y0
+
+    def _update_regions(self, ids, cls, centroids, w: int, h: int):
+        """Aplica as linhas e zonas nomeadas às posições do frame."""
+        with self._lock:
+            lines = list(self.lines.items())
+            zones = list(self.zones.items())
+        scale = np.array([w, h], dtype=np.float32)
+
+        for name, line in lines:
+            points = np.asarray(line["points"], dtype=np.float32) * scale
+            ids_in, ids_out = line["counter"].update(ids, centroids, points, self._frame_idx)
+            for tid, c in zip(ids_out.tolist(), values_for(ids, cls, ids_out).tolist()):
+                line["counts"]["out"] += 1
+                self._emit_event("OUT", -1, tid, line=name, class_name=self._class_name(c))
+            for tid, c in zip(ids_in.tolist(), values_for(ids, cls, ids_in).tolist()):
+                line["counts"]["in"] += 1
+                self._emit_event("IN", +1, tid, line=name, class_name=self._class_name(c))
+
+        for name, zone in zones:
+            points = np.asarray(zone["points"], dtype=np.float32) * scale
+            ids_enter, ids_exit = zone["counter"].update(ids, centroids, points, self._frame_idx)
+            for tid, c in zip(ids_enter.tolist(), values_for(ids, cls, ids_enter).tolist()):
+                zone["counts"]["in"] += 1
+                self._emit_event("ENTER", +1, tid, zone=name, class_name=self._class_name(c))
+            for tid, c in zip(ids_exit.tolist(), values_for(ids, cls, ids_exit).tolist()):
+                zone["counts"]["out"] += 1
+                self._emit_event("EXIT", -1, tid, zone=name, class_name=self._class_name(c))
+
+    def _render_loop(self):
+        """Desenha e codifica o último frame no ritmo do preview, só com viewers."""
+        interval = 1.0 / max(self.preview_fps, 0.1)
+        rendered = None
+        while self.is_running:
+            if self.viewers <= 0:
+                self._viewers_changed.wait(timeout=1.0)
+                self._viewers_changed.clear()
+                continue
+            t0 = time.monotonic()
+            snapshot = self._snapshot
+            if snapshot is not None and snapshot is not rendered:
+                try:
+                    jpeg = self._render(snapshot)
+                    if jpeg is not None:
+                        self.latest_jpeg = jpeg
+                        if self.on_frame is not None:
+                            self.on_frame(jpeg)
+                except Exception as e:
+                    print(f"Erro ao renderizar preview: {e}")
+                rendered = snapshot
+            time.sleep(max(0.0, interval - (time.monotonic() - t0)))
+
+    def _render(self, snapshot):
+        # desenha numa cópia (já reduzida ao perfil do preview): o frame
+        # original pode estar indo para o detector
+        frame, scale = fit_width(snapshot["frame"], self.preview_max_width)
+        if scale == 1.0:
+            frame = frame.copy()
+        cv2.polylines(frame, [(snapshot["polyline"] * scale).astype(np.int32)], False, (0, 255, 0), 2)
+        self._draw_regions(frame)
+
+        # desenha bbox/centroide
+        boxes, centroids = snapshot["boxes"] * scale, snapshot["centroids"] * scale
+        for (x1, y1, x2, y2), (px, py) in zip(boxes.astype(int).tolist(), centroids.astype(int).tolist()):
+            cv2.rectangle(frame, (x1, y1), (x2, y2), (255, 0, 0), 2)
+            cv2.circle(frame, (px, py), 3, (0, 0, 255), -1)
+
+        # escreve contadores no frame
+        class_name = ""
+        if self.camera and hasattr(self.camera, 'detection_class_name'):
+            class_name = f" ({self.camera.detection_class_name})"
+        
+        # Debug info
+        debug_info = f"Detections: {len(boxes)}"
+        if self.classes:
+            debug_info += f" | Class: {', '.join(self._class_name(c) for c in self.classes)}"
+        if len(self.class_counts) > 1:
+            debug_info += " | " + "  ".join(
+                f"{name}: {c['in']}/{c['out']}" for name, c in list(self.class_counts.items())
+            )
+        
+        cv2.putText(frame, f"IN: {self.counts['in']}  OUT: {self.counts['out']}{class_name}",
+                    (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (255,255,255), 2)
+        cv2.putText(frame, debug_info,
+                    (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255,255,0), 2)
+
+        return self._encoder.encode(frame)
 
-    def _side(self, cy: float, line_y: float) -> int:
-        # -1 acima, +1 abaixo
-        return -1 if cy < line_y else 1
+    def _draw_regions(self, frame):
+        h, w = frame.shape[:2]
+        scale = np.array([w, h], dtype=np.float32)
+        with self._lock:
+            regions = [(name, r["points"], False) for name, r in self.lines.items()]
+            regions += [(name, r["points"], True) for name, r in self.zones.items()]
+        for name, points, closed in regions:
+            pts = (np.asarray(points, dtype=np.float32) * scale).astype(np.int32)
+            color = (255, 255, 0) if closed else (0, 255, 255)
+            cv2.polylines(frame, [pts], closed, color, 2)
+            cv2.putText(frame, name, (int(pts[0][0]) + 4, int(pts[0][1]) - 6),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
 
     def _loop(self):
         # Verificar se YOLO está disponível
@@ -114,154 +393,146 @@ class VideoCounterProcessor:
             self.is_running = False
             return
         
-        # Inicializar modelo YOLO na thread de processamento
-        if self.model is None:
-            try:
-                torch.set_num_threads(1)
-                self.model = YOLO(self.model_path)
-            except Exception as e:
-                print(f"Erro ao carregar modelo YOLO: {e}")
-                self.is_running = False
-                return
-        
-        self.cap = cv2.VideoCapture(self.video_path)
-        if not self.cap.isOpened():
+        # Engine de inferência compartilhada (um modelo carregado para todas as câmeras)
+        try:
+            self._engine = acquire_engine(self.model_path, self.device)
+            self.class_names = dict(getattr(self._engine.model, "names", {}) or {})
+        except Exception as e:
+            print(f"Erro ao carregar modelo YOLO: {e}")
+            self.is_running = False
+            return
+
+        try:
+            self._run()
+        finally:
+            release_engine(self._engine, self._stream_id)
+            self._engine = None
+
+    def _run(self):
+        # captura em thread própria: a inferência sempre consome o frame mais novo
+        self._grabber = FrameGrabber(self.video_path)
+        if not self._grabber.open():
             self.is_running = False
             return
 
-        self.fps = float(self.cap.get(cv2.CAP_PROP_FPS) or 30.0)
+        self.fps = self._grabber.fps
+        # TTL em frames processados (com descarte de frames o TTL real fica maior)
+        for table in self._track_tables():
+            table.ttl_frames = max(1, int(self.track_ttl_s * self.fps))
+        self._grabber.start()
+        last_seq = 0
 
         while self.is_running:
             if self.is_paused:
                 time.sleep(0.05)
                 continue
 
-            ok, frame = self.cap.read()
-            if not ok:
-                # loop no vídeo (teste)
-                self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            captured = self._grabber.read_latest(last_seq, timeout=1.0)
+            if captured is None:
+                if not self._grabber.is_running:
+                    print("Captura encerrada")
+                    self.is_running = False
                 continue
 
+            if last_seq and captured.seq > last_seq + 1:
+                self.frames_dropped += captured.seq - last_seq - 1
+            last_seq = captured.seq
+            frame = captured.image
+
             if self.resize_scale != 1.0:
                 frame = cv2.resize(frame, None, fx=self.resize_scale, fy=self.resize_scale)
 
             h, w = frame.shape[:2]
 
             with self._lock:
-                line_y = int(self.line_y_norm * h)
-
-            # desenha a linha no frame
-            cv2.line(frame, (0, line_y), (w - 1, line_y), (0, 255, 0), 2)
-
-            # tracking com persistência (muito importante!)
-            results = self.model.track(
-                frame,
-                conf=self.conf,
-                classes=self.classes,
-                persist=True,
-                verbose=False
-            )
+                line_norm = np.asarray(self._line_norm(), dtype=np.float32)
+            polyline = line_norm * np.array([w, h], dtype=np.float32)
+            line_top, line_bottom = int(polyline[:, 1].min()), int(polyline[:, 1].max())
+
+            # sem movimento na região de contagem: nem detector nem tracker
+            moving = True
+            if self._motion_gate is not None:
+                region = None
+                if 0.0 < self.roi_band < 1.0:
+                    region = (line_norm[:, 1].min() - self.roi_band / 2, line_norm[:, 1].max() + self.roi_band / 2)
+                moving = self._motion_gate.check(frame, region)
+
+            # keyframe: detecção em lote + tracking com persistência por câmera (muito importante!)
+            # demais frames: caixas extrapoladas a partir dos últimos keyframes
+            if not moving:
+                det = Detections.empty()
+                self._predictor.reset()
+                self._frames_since_detect = 0
+                self.frames_idle += 1
+            elif self._frames_since_detect + 1 >= self._current_stride:
+                roi, roi_y0 = self._roi(frame, line_top, line_bottom)
+                try:
+                    det = self._engine.infer(
+                        self._stream_id,
+                        roi,
+                        conf=self.conf,
+                        classes=self.classes,
+                        frame_rate=max(1, int(round(self.fps / self.detect_stride))),
+                        offset=(0, roi_y0) if roi_y0 else None,
+                    )
+                except Exception as e:
+                    print(f"Erro na inferência: {e}")
+                    continue
+                self.detector_calls += 1
+                self._frames_since_detect = 0
+                self._predictor.update(det, captured.ts)
+            else:
+                det = self._predictor.predict(captured.ts)
+                self._frames_since_detect += 1
+
+            # objeto perto da linha -> detecta todo frame para não perder o cruzamento
+            if near_line(det, polyline, self.stride_line_margin * h):
+                self._current_stride = 1
+            else:
+                self._current_stride = self.detect_stride
 
             self._frame_idx += 1
 
-            # reduz cooldown
-            to_del = []
-            for k, v in self._counted_recently.items():
-                nv = v - 1
-                if nv <= 0:
-                    to_del.append(k)
-                else:
-                    self._counted_recently[k] = nv
-            for k in to_del:
-                del self._counted_recently[k]
-            
-            r = results[0]
-            if r.boxes is not None and r.boxes.xyxy is not None:
-                boxes = r.boxes.xyxy.cpu().numpy()
-                ids = None
-                
-                # Debug: mostrar quantas detecções
-                if len(boxes) > 0 and self._frame_idx % 30 == 0:  # A cada 30 frames
-                    print(f"Frame {self._frame_idx}: {len(boxes)} detecções, classes filtradas: {self.classes}")
-
-                # ids existem quando o tracker está funcionando
-                if r.boxes.id is not None:
-                    ids = r.boxes.id.cpu().numpy().astype(int)
-
-                for i, b in enumerate(boxes):
-                    x1, y1, x2, y2 = b.tolist()
-                    cx = (x1 + x2) / 2.0
-                    cy = (y1 + y2) / 2.0
-
-                    # desenha bbox/centroide
-                    cv2.rectangle(frame, (int(x1), int(y1)), (int(x2), int(y2)), (255, 0, 0), 2)
-                    cv2.circle(frame, (int(cx), int(cy)), 3, (0, 0, 255), -1)
-
-                    if ids is None:
-                        # Sem ID consistente não dá pra contar cruzamento direito
-                        print(f"Frame {self._frame_idx}: Sem IDs de tracking - objeto detectado mas não rastreado")
-                        continue
-
-                    tid = int(ids[i])
-                    
-                    # Debug: mostrar posição do objeto em relação à linha
-                    side_text = "acima" if cy < line_y else "abaixo"
-                    if self._frame_idx % 30 == 0:  # A cada 30 frames
-                        print(f"ID {tid}: cy={cy:.1f}, linha={line_y}, {side_text}")
-
-                    prev_side = self._last_side_by_id.get(tid)
-                    curr_side = self._side(cy, line_y)
-                    self._last_side_by_id[tid] = curr_side
-
-                    # se não tinha histórico ainda, continua
-                    if prev_side is None:
-                        print(f"ID {tid}: Primeiro frame detectado, lado {curr_side}")
-                        continue
-
-                    # cruzou a linha? (mudou lado)
-                    if prev_side != curr_side:
-                        # debounce
-                        if tid in self._counted_recently:
-                            print(f"ID {tid}: Cruzamento ignorado (debounce ativo)")
-                            continue
-
-                        # define direção
-                        # -1->+1: atravessou de cima pra baixo (OUT por exemplo)
-                        # +1->-1: baixo pra cima (IN por exemplo)
-                        if prev_side == -1 and curr_side == 1:
-                            self.counts["out"] += 1
-                            print(f"OUT: ID {tid} cruzou linha (cima->baixo) - Total OUT: {self.counts['out']}")
-                            from .manager import counter_manager
-                            counter_manager.add_event("OUT", -1, track_id=tid)      
-                        elif prev_side == 1 and curr_side == -1:
-                            self.counts["in"] += 1
-                            print(f"IN: ID {tid} cruzou linha (baixo->cima) - Total IN: {self.counts['in']}")
-                            counter_manager.add_event("IN", +1, track_id=tid)
-
-                        self._counted_recently[tid] = self._cooldown_frames
-                
-                # TESTE: Incrementar contador a cada 60 frames para testar comunicação
-                if self._frame_idx % 60 == 0:
-                    self.counts["in"] += 1
-                    print(f"TESTE: Incrementando IN para testar - Total: {self.counts['in']}")
-
-            # escreve contadores no frame
-            class_name = ""
-            if self.camera and hasattr(self.camera, 'detection_class_name'):
-                class_name = f" ({self.camera.detection_class_name})"
-            
-            # Debug info
-            debug_info = f"Detections: {len(boxes) if r.boxes is not None and r.boxes.xyxy is not None else 0}"
-            if self.classes:
-                debug_info += f" | Class: {self.classes[0]}"
-            
-            cv2.putText(frame, f"IN: {self.counts['in']}  OUT: {self.counts['out']}{class_name}",
-                        (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (255,255,255), 2)
-            cv2.putText(frame, debug_info,
-                        (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255,255,0), 2)
-
-            ok2, jpg = cv2.imencode(".jpg", frame)
-            if ok2:
-                self.latest_jpeg = jpg.tobytes()
-
-            time.sleep(1.0 / max(self.fps, 1.0))
+            boxes = det.xyxy
+            # ids existem quando o tracker está funcionando
+            ids = det.ids
+            cx = (boxes[:, 0] + boxes[:, 2]) / 2.0
+            cy = (boxes[:, 1] + boxes[:, 3]) / 2.0
+            centroids = np.stack([cx, cy], axis=1)
+
+            if len(boxes) > 0 and self._frame_idx % 30 == 0:
+                logger.debug("Frame %d: %d detecções, classes filtradas: %s",
+                             self._frame_idx, len(boxes), self.classes)
+
+            # cruzou a linha? (deslocamento desde o último frame corta um segmento, fora do debounce)
+            if ids is not None:
+                ids_in, ids_out = self._crossings.update(ids, centroids, polyline, self._frame_idx)
+                # cima->baixo = OUT, baixo->cima = IN
+                for tid, c in zip(ids_out.tolist(), values_for(ids, det.cls, ids_out).tolist()):
+                    self._count_main("OUT", tid, c)
+                for tid, c in zip(ids_in.tolist(), values_for(ids, det.cls, ids_in).tolist()):
+                    self._count_main("IN", tid, c)
+                # cena parada: frame vazio do gate não é "zona vazia", mantém a ocupação
+                if (self.lines or self.zones) and moving:
+                    self._update_regions(ids, det.cls, centroids, w, h)
+            elif len(boxes) > 0:
+                # Sem ID consistente não dá pra contar cruzamento direito
+                logger.debug("Frame %d: sem IDs de tracking", self._frame_idx)
+
+            if self._frame_idx % 100 == 0:
+                for table in self._track_tables():
+                    table.evict(self._frame_idx)
+
+            # só referências: desenho e JPEG ficam com a thread de preview
+            self._snapshot = {
+                "frame": frame,
+                "polyline": polyline,
+                "boxes": boxes,
+                "centroids": centroids,
+            }
+
+            self.frames_processed += 1
+            self.latency_ms = (time.time() - captured.ts) * 1000.0
+
+        # stop() pode ter chegado antes do grabber existir
+        self._grabber.stop()
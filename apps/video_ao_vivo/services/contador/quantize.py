@@ -0,0 +1,188 @@
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+from django.conf import settings
+
+from .export import (
+    artifact_path, export_model, exporter_available, is_fresh, relative_to_media, start_background_job,
+)
+
+
+def sample_calibration_frames(source: str, count: int = 64, stride: int = 10, max_reads: int = 5000):
+    """Lê `count` frames da câmera, pegando 1 a cada `stride` para variar a cena."""
+    cap = cv2.VideoCapture(str(source))
+    if not cap.isOpened():
+        raise RuntimeError(f"Não foi possível abrir {source}")
+    frames = []
+    reads = 0
+    try:
+        while len(frames) < count and reads < max_reads:
+            ok, frame = cap.read()
+            reads += 1
+            if not ok:
+                continue
+            if reads % stride == 0:
+                frames.append(frame)
+    finally:
+        cap.release()
+    if not frames:
+        raise RuntimeError(f"Nenhum frame lido de {source}")
+    return frames
+
+
+def save_calibration_frames(frames, model_config, camera) -> Path:
+    """Guarda os frames usados na calibração (auditoria / recalibração)."""
+    out_dir = Path(settings.MEDIA_ROOT) / "calibration" / f"model_{model_config.id}_camera_{camera.id}"
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for i, frame in enumerate(frames):
+        cv2.imwrite(str(out_dir / f"frame_{i:04d}.jpg"), frame)
+    return out_dir
+
+
+def letterbox(frame, imgsz: int = 640):
+    """Mesmo pré-processamento do ultralytics: resize mantendo proporção + borda 114."""
+    h, w = frame.shape[:2]
+    r = min(imgsz / h, imgsz / w)
+    nh, nw = int(round(h * r)), int(round(w * r))
+    resized = cv2.resize(frame, (nw, nh), interpolation=cv2.INTER_LINEAR)
+    canvas = np.full((imgsz, imgsz, 3), 114, dtype=np.uint8)
+    top, left = (imgsz - nh) // 2, (imgsz - nw) // 2
+    canvas[top:top + nh, left:left + nw] = resized
+    blob = canvas[:, :, ::-1].transpose(2, 0, 1)  # BGR->RGB, HWC->CHW
+    return np.ascontiguousarray(blob, dtype=np.float32)[None] / 255.0
+
+
+class _FramesCalibrationReader:
+    """CalibrationDataReader do onnxruntime alimentado pelos frames da câmera."""
+
+    def __init__(self, input_name: str, frames, imgsz: int):
+        self._batches = iter([{input_name: letterbox(f, imgsz)} for f in frames])
+
+    def get_next(self):
+        return next(self._batches, None)
+
+    def rewind(self):
+        pass
+
+
+def _box_agreement(ref, other, iou_thres: float = 0.5) -> float:
+    """Fração das detecções FP32 reencontradas no INT8 (mesma classe, IoU >= limiar)."""
+    if len(ref) == 0:
+        return 1.0 if len(other) == 0 else 0.0
+    if len(other) == 0:
+        return 0.0
+    a, b = ref[:, :4], other[:, :4]
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    iou = inter / (area_a[:, None] + area_b[None, :] - inter + 1e-9)
+    same_cls = ref[:, None, 4] == other[None, :, 4]
+    matched = ((iou >= iou_thres) & same_cls).any(axis=1)
+    return float(matched.mean())
+
+
+def benchmark_variants(fp32_path: str, int8_path: str, frames, conf: float = 0.25):
+    """
+    Compara as duas variantes nos mesmos frames.
+
+    Retorna latência média (ms) de cada uma e a concordância média das
+    detecções do INT8 com as do FP32 (proxy de perda de acurácia).
+    """
+    from .processor import YOLO
+
+    def run(model, frame):
+        t0 = time.perf_counter()
+        result = model.predict(frame, conf=conf, verbose=False, device="cpu")[0]
+        elapsed = (time.perf_counter() - t0) * 1000.0
+        boxes = result.boxes
+        if boxes is None or len(boxes) == 0:
+            return elapsed, np.zeros((0, 5), dtype=np.float32)
+        dets = np.concatenate([boxes.xyxy.cpu().numpy(), boxes.cls.cpu().numpy()[:, None]], axis=1)
+        return elapsed, dets
+
+    fp32, int8 = YOLO(fp32_path), YOLO(int8_path)
+    # aquecimento (criação das sessões onnxruntime)
+    run(fp32, frames[0])
+    run(int8, frames[0])
+
+    fp32_times, int8_times, agreement = [], [], []
+    for frame in frames:
+        t_fp32, d_fp32 = run(fp32, frame)
+        t_int8, d_int8 = run(int8, frame)
+        fp32_times.append(t_fp32)
+        int8_times.append(t_int8)
+        agreement.append(_box_agreement(d_fp32, d_int8))
+
+    return {
+        "fp32_latency_ms": float(np.mean(fp32_times)),
+        "int8_latency_ms": float(np.mean(int8_times)),
+        "agreement": float(np.mean(agreement)),
+    }
+
+
+def quantize_model(model_config, camera, num_frames: int = 64, imgsz: int = 640):
+    """
+    Gera a variante INT8 (quantização estática pós-treino) de um modelo.
+
+    A calibração usa frames da própria câmera. O FP32 de referência é o
+    ONNX exportado (exporta antes se ainda não existir). O resultado do
+    benchmark FP32 x INT8 fica salvo no ModelConfiguration.
+    """
+    import onnxruntime as ort
+    from onnxruntime.quantization import QuantFormat, QuantType, quantize_static
+
+    pt_path = model_config.model_file.path
+    fp32_path = artifact_path(pt_path, "onnx")
+    if not is_fresh(fp32_path, pt_path):
+        export_model(model_config, backends=("onnx",), imgsz=imgsz)
+
+    frames = sample_calibration_frames(camera.primary_url, count=num_frames)
+    save_calibration_frames(frames, model_config, camera)
+
+    input_name = ort.InferenceSession(str(fp32_path), providers=["CPUExecutionProvider"]).get_inputs()[0].name
+    int8_path = artifact_path(pt_path, "onnx-int8")
+    quantize_static(
+        str(fp32_path),
+        str(int8_path),
+        _FramesCalibrationReader(input_name, frames, imgsz),
+        quant_format=QuantFormat.QDQ,
+        activation_type=QuantType.QUInt8,
+        weight_type=QuantType.QInt8,
+        per_channel=True,
+    )
+
+    report = benchmark_variants(str(fp32_path), str(int8_path), frames, conf=model_config.confidence_threshold)
+
+    model_config.int8_path = relative_to_media(int8_path)
+    model_config.fp32_latency_ms = report["fp32_latency_ms"]
+    model_config.int8_latency_ms = report["int8_latency_ms"]
+    model_config.int8_agreement = report["agreement"]
+    model_config.save(update_fields=["int8_path", "fp32_latency_ms", "int8_latency_ms", "int8_agreement"])
+    return report
+
+
+def quantize_model_async(model_config, camera, **kwargs):
+    """
+    quantize_model em segundo plano (calibração + benchmark levam minutos).
+
+    Retorna a thread, ou None se o onnxruntime não está instalado ou se o
+    modelo já está sendo quantizado.
+    """
+    if not exporter_available("onnx"):
+        print(f"Quantização de {model_config.name} ignorada: onnx/onnxruntime não instalados")
+        return None
+
+    def run():
+        try:
+            report = quantize_model(model_config, camera, **kwargs)
+            print(f"Modelo {model_config.name} quantizado para INT8: {report}")
+        except Exception as e:
+            print(f"Erro ao quantizar modelo {model_config.name}: {e}")
+
+    return start_background_job((model_config.pk, "quantize"), run)
@@ -0,0 +1,79 @@
+import threading
+import time
+from collections import OrderedDict
+
+_KINDS = {"IN": 0, "OUT": 1}
+
+
+class TimeBuckets:
+    """
+    Contadores IN/OUT por classe em janelas de width_s segundos.
+
+    Guarda só as `keep` janelas mais recentes. Os eventos chegam em ordem
+    de tempo, então a ordem de inserção do OrderedDict já é a ordem
+    cronológica e descartar a janela mais antiga é O(1).
+    """
+
+    def __init__(self, width_s: int, keep: int):
+        self.width_s = width_s
+        self.keep = keep
+        self._buckets = OrderedDict()  # início (epoch) -> {classe: [in, out]}
+
+    def bucket_start(self, ts: float) -> int:
+        return int(ts // self.width_s) * self.width_s
+
+    def add(self, ts: float, class_name, column: int, delta: int):
+        start = self.bucket_start(ts)
+        bucket = self._buckets.get(start)
+        if bucket is None:
+            bucket = self._buckets[start] = {}
+            while len(self._buckets) > self.keep:
+                self._buckets.popitem(last=False)
+        counts = bucket.setdefault(class_name, [0, 0])
+        counts[column] += delta
+
+    def series(self, n: int, now: float, class_name=None):
+        """Últimas n janelas (a mais antiga primeiro), com zero onde não houve evento."""
+        last = self.bucket_start(now)
+        out = []
+        for start in range(last - (n - 1) * self.width_s, last + 1, self.width_s):
+            bucket = self._buckets.get(start, {})
+            if class_name is not None:
+                bucket = {class_name: bucket[class_name]} if class_name in bucket else {}
+            out.append({
+                "start": start,
+                "in": sum(c[0] for c in bucket.values()),
+                "out": sum(c[1] for c in bucket.values()),
+            })
+        return out
+
+
+class LiveRollup:
+    """
+    Totais por minuto e por hora de uma câmera, atualizados a cada evento.
+
+    Os gráficos leem daqui em vez de reprocessar o log da sessão: o custo
+    de uma consulta depende do número de janelas pedidas, não de quantos
+    eventos a sessão já teve.
+    """
+
+    def __init__(self, minutes: int = 180, hours: int = 48):
+        self._lock = threading.Lock()
+        self.minute = TimeBuckets(60, minutes)
+        self.hour = TimeBuckets(3600, hours)
+
+    def add(self, ts: float, kind: str, delta: int = 1, class_name=None):
+        """Soma um evento; kind escolhe a coluna, então só o módulo de delta conta (OUT vem com -1)."""
+        column = _KINDS.get(kind)
+        if column is None:
+            return
+        count = abs(delta)
+        with self._lock:
+            self.minute.add(ts, class_name, column, count)
+            self.hour.add(ts, class_name, column, count)
+
+    def series(self, granularity: str = "minute", n: int = 10, now: float = None, class_name=None):
+        buckets = self.hour if granularity == "hour" else self.minute
+        with self._lock:
+            return buckets.series(n, time.time() if now is None else now, class_name)
+
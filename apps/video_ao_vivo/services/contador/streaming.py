@@ -0,0 +1,125 @@
+import asyncio
+import threading
+from functools import lru_cache
+
+BOUNDARY = b"frame"
+
+
+def frame_chunk(jpeg: bytes) -> bytes:
+    """JPEG já embrulhado como parte do multipart/x-mixed-replace."""
+    return (b"--" + BOUNDARY + b"\r\n"
+            b"Content-Type: image/jpeg\r\n"
+            b"Content-Length: " + str(len(jpeg)).encode() + b"\r\n\r\n" + jpeg + b"\r\n")
+
+
+@lru_cache(maxsize=1)
+def placeholder_chunk() -> bytes:
+    """Imagem de "contador não iniciado", codificada uma única vez."""
+    import cv2
+    import numpy as np
+
+    blank = np.zeros((480, 640, 3), dtype=np.uint8)
+    cv2.putText(blank, 'Contador nao iniciado', (150, 220),
+                cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
+    cv2.putText(blank, 'Inicie a contagem primeiro', (120, 260),
+                cv2.FONT_HERSHEY_SIMPLEX, 0.8, (200, 200, 200), 2)
+    _, buffer = cv2.imencode('.jpg', blank)
+    return frame_chunk(buffer.tobytes())
+
+
+class Notifier:
+    """
+    Número de sequência que avisa quem espera por mudanças.
+
+    Threads esperam na condition; corrotinas (views ASGI) esperam num
+    asyncio.Event do seu próprio loop, e quem publica só agenda o set() com
+    call_soon_threadsafe, sem bloquear.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self.seq = 0
+        self._async_waiters = set()  # {(loop, asyncio.Event)}
+
+    def _notify(self):
+        """Acorda todos os waiters. Chamar com self._cond."""
+        self._cond.notify_all()
+        for loop, event in self._async_waiters:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                # loop já encerrado
+                pass
+
+    def bump(self):
+        with self._cond:
+            self.seq += 1
+            self._notify()
+
+    def wait_seq(self, after_seq: int, timeout: float = 1.0) -> int:
+        """Bloqueia até seq != after_seq (ou timeout) e retorna o seq atual."""
+        with self._cond:
+            self._cond.wait_for(lambda: self.seq != after_seq, timeout)
+            return self.seq
+
+    async def wait_seq_async(self, after_seq: int, timeout: float = 1.0) -> int:
+        """Versão para corrotinas de wait_seq(): não ocupa thread enquanto espera."""
+        loop = asyncio.get_running_loop()
+        event = asyncio.Event()
+        waiter = (loop, event)
+        with self._cond:
+            if self.seq != after_seq:
+                return self.seq
+            self._async_waiters.add(waiter)
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._cond:
+                self._async_waiters.discard(waiter)
+        return self.seq
+
+
+class FrameHub(Notifier):
+    """
+    Distribui o preview de uma câmera para todos os viewers.
+
+    Cada frame codificado é publicado uma vez, já no formato multipart, com
+    um número de sequência. Os viewers esperam até a sequência mudar e
+    sempre recebem o frame mais recente (quem atrasou pula os
+    intermediários), então N viewers custam uma única codificação.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._chunk = None
+
+    def publish(self, jpeg: bytes):
+        chunk = frame_chunk(jpeg)
+        with self._cond:
+            self._chunk = chunk
+            self.seq += 1
+            self._notify()
+
+    def clear(self):
+        """Contador parado: viewers voltam para o placeholder."""
+        with self._cond:
+            self._chunk = None
+            self.seq += 1
+            self._notify()
+
+    def wait(self, after_seq: int, timeout: float = 1.0):
+        """
+        Bloqueia até haver frame mais novo que after_seq (ou timeout).
+
+        Retorna (seq, chunk); chunk None = sem preview no momento.
+        """
+        self.wait_seq(after_seq, timeout)
+        with self._cond:
+            return self.seq, self._chunk
+
+    async def wait_async(self, after_seq: int, timeout: float = 1.0):
+        await self.wait_seq_async(after_seq, timeout)
+        with self._cond:
+            return self.seq, self._chunk
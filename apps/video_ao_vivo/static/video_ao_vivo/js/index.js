@@ -32,6 +32,7 @@
   // ===== STATE =====
   let isPaused = false;
   let statusTimer = null;
+  let statusSource = null;
   let isDragging = false;
 
   // meta do vídeo (frame real)
@@ -257,21 +258,24 @@
     }, minInterval);
   }
 
-  // ===== Status poll =====
+  // ===== Status (SSE com fallback para polling) =====
+  function applyStatus(data) {
+    if (countInEl) countInEl.textContent = String(data.in ?? 0);
+    if (countOutEl) countOutEl.textContent = String(data.out ?? 0);
+
+    // mantém coerente com backend
+    isPaused = !!data.paused;
+
+    if (btnPlay) {
+      btnPlay.textContent = isPaused ? "▶" : "⏸";
+      btnPlay.title = isPaused ? "Retomar" : "Pausar";
+    }
+  }
+
   async function refreshStatus() {
     if (!URLS.status) return;
     try {
-      const data = await fetchJSON(URLS.status);
-      if (countInEl) countInEl.textContent = String(data.in ?? 0);
-      if (countOutEl) countOutEl.textContent = String(data.out ?? 0);
-
-      // mantém coerente com backend
-      isPaused = !!data.paused;
-
-      if (btnPlay) {
-        btnPlay.textContent = isPaused ? "▶" : "⏸";
-        btnPlay.title = isPaused ? "Retomar" : "Pausar";
-      }
+      applyStatus(await fetchJSON(URLS.status));
     } catch (e) {
       // Se falhar, não spamma console
     }
@@ -296,8 +300,33 @@
 
 
   function startStatusPolling() {
-    if (statusTimer) clearInterval(statusTimer);
+    stopStatusPolling();
+
+    // Servidor empurra contagens/eventos; EventSource reconecta sozinho
+    // mandando Last-Event-ID, então nenhum evento se perde na reconexão.
+    if (URLS.live_events && window.EventSource) {
+      const source = new EventSource(`${URLS.live_events}?after=${lastEventId}`);
+      source.addEventListener("status", (e) => applyStatus(JSON.parse(e.data)));
+      source.addEventListener("count", (e) => {
+        const ev = JSON.parse(e.data);
+        if (ev.id <= lastEventId) return;
+        if (logListEl) addLogItem(ev);
+        lastEventId = ev.id;
+      });
+      source.onerror = () => {
+        // CLOSED = navegador desistiu de reconectar: volta ao polling
+        if (source.readyState === EventSource.CLOSED && statusSource === source) {
+          statusSource = null;
+          startPollingFallback();
+        }
+      };
+      statusSource = source;
+      return;
+    }
+    startPollingFallback();
+  }
 
+  function startPollingFallback() {
     statusTimer = setInterval(async () => {
       await refreshStatus();
       await refreshEvents();
@@ -309,6 +338,8 @@
 
 
   function stopStatusPolling() {
+    if (statusSource) statusSource.close();
+    statusSource = null;
     if (statusTimer) clearInterval(statusTimer);
     statusTimer = null;
   }
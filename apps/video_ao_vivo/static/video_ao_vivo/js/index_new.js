@@ -6,6 +6,7 @@
   let lineYNorm = 0.5;
   let isPaused = false;
   let statusTimer = null;
+  let statusSource = null;
   let lastEventId = 0;
 
   // Elementos DOM
@@ -129,14 +130,17 @@
   });
 
   // Etapa 3: Contagem ativa
+  function applyStatus(data) {
+    document.getElementById('countIn').textContent = data.in ?? 0;
+    document.getElementById('countOut').textContent = data.out ?? 0;
+    document.getElementById('countBalance').textContent = (data.in ?? 0) - (data.out ?? 0);
+    isPaused = !!data.paused;
+    btnPause.textContent = isPaused ? '▶ Retomar' : '⏸ Pausar';
+  }
+
   async function refreshStatus() {
     try {
-      const data = await fetchJSON(URLS.status);
-      document.getElementById('countIn').textContent = data.in ?? 0;
-      document.getElementById('countOut').textContent = data.out ?? 0;
-      document.getElementById('countBalance').textContent = (data.in ?? 0) - (data.out ?? 0);
-      isPaused = !!data.paused;
-      btnPause.textContent = isPaused ? '▶ Retomar' : '⏸ Pausar';
+      applyStatus(await fetchJSON(URLS.status));
     } catch (e) {}
   }
 
@@ -151,7 +155,30 @@
   }
 
   function startStatusPolling() {
-    if (statusTimer) clearInterval(statusTimer);
+    stopStatusPolling();
+    // SSE quando disponível; polling só como fallback
+    if (URLS.live_events && window.EventSource) {
+      const source = new EventSource(`${URLS.live_events}?after=${lastEventId}`);
+      source.addEventListener('status', (e) => applyStatus(JSON.parse(e.data)));
+      source.addEventListener('count', (e) => {
+        const ev = JSON.parse(e.data);
+        if (ev.id <= lastEventId) return;
+        addLogItem(ev);
+        lastEventId = ev.id;
+      });
+      source.onerror = () => {
+        if (source.readyState === EventSource.CLOSED && statusSource === source) {
+          statusSource = null;
+          startPollingFallback();
+        }
+      };
+      statusSource = source;
+      return;
+    }
+    startPollingFallback();
+  }
+
+  function startPollingFallback() {
     statusTimer = setInterval(async () => {
       await refreshStatus();
       await refreshEvents();
@@ -161,6 +188,8 @@
   }
 
   function stopStatusPolling() {
+    if (statusSource) statusSource.close();
+    statusSource = null;
     if (statusTimer) clearInterval(statusTimer);
     statusTimer = null;
   }
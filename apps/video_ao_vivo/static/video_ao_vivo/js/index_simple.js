@@ -21,6 +21,13 @@
   const countLine = document.getElementById('countLine');
   const liveStatus = document.getElementById('liveStatus');
 
+  // Acrescenta camera_id às rotas do contador (vários contadores simultâneos)
+  function withCamera(url) {
+    if (!selectedCamera) return url;
+    const sep = url.includes('?') ? '&' : '?';
+    return `${url}${sep}camera_id=${encodeURIComponent(selectedCamera)}`;
+  }
+
   // Verificar se os elementos existem
   if (!cameraSelect || !btnSelectCamera) {
     console.error('Elementos não encontrados');
@@ -163,7 +170,7 @@
               'Content-Type': 'application/json',
               'X-CSRFToken': getCookie('csrftoken')
             },
-            body: JSON.stringify({ line_y_norm: lineYNorm })
+            body: JSON.stringify({ line_y_norm: lineYNorm, camera_id: selectedCamera })
           });
           console.log('Resposta da linha:', lineResponse.status);
           const lineData = await lineResponse.json();
@@ -202,7 +209,7 @@
         const liveStreamEl = document.getElementById('liveStream');
         if (liveStreamEl && URLS.stream) {
           console.log('Iniciando stream processado:', URLS.stream);
-          liveStreamEl.src = URLS.stream;
+          startLiveStream(liveStreamEl);
           liveStreamEl.onerror = () => console.error('Erro ao carregar stream processado');
           liveStreamEl.onload = () => console.log('Stream processado carregado');
         }
@@ -283,54 +290,109 @@
     return m ? decodeURIComponent(m[2]) : null;
   }
   
-  function startStatusPolling() {
+  // O servidor encerra cada conexão MJPEG após VIDEO_AO_VIVO_STREAM_MAX_S;
+  // reabre o stream um pouco antes para a imagem não congelar.
+  function startLiveStream(img) {
+    const URLS = window.VIDEO_AO_VIVO_URLS || {};
+    const maxSeconds = window.VIDEO_AO_VIVO_STREAM_MAX_S || 300;
+    const reopen = () => {
+      const url = withCamera(URLS.stream);
+      img.src = `${url}${url.includes('?') ? '&' : '?'}t=${Date.now()}`;
+    };
+    stopLiveStream(img);
+    reopen();
+    window.streamRefreshInterval = setInterval(reopen, Math.max(5, maxSeconds - 5) * 1000);
+  }
+
+  function stopLiveStream(img) {
+    if (window.streamRefreshInterval) {
+      clearInterval(window.streamRefreshInterval);
+      window.streamRefreshInterval = null;
+    }
+    img.src = '';
+  }
+
+  function applyStatus(data) {
     const URLS = window.VIDEO_AO_VIVO_URLS || {};
+    const countInEl = document.getElementById('countIn');
+    const countOutEl = document.getElementById('countOut');
+    const countBalanceEl = document.getElementById('countBalance');
     
-    // Limpar polling anterior se existir
+    if (countInEl) countInEl.textContent = data.in || 0;
+    if (countOutEl) countOutEl.textContent = data.out || 0;
+    if (countBalanceEl) countBalanceEl.textContent = (data.in || 0) - (data.out || 0);
+    
+    // Atualizar botão pause/resume
+    if (btnPause) {
+      if (data.paused) {
+        btnPause.textContent = '▶ Retomar';
+        btnPause.onclick = async () => {
+          try {
+            const response = await fetch(withCamera(URLS.resume), { method: 'POST' });
+            if (!response.ok) throw new Error('Erro ao retomar');
+            console.log('Contagem retomada');
+          } catch (error) {
+            alert('Erro ao retomar: ' + error.message);
+          }
+        };
+      } else {
+        btnPause.textContent = '⏸ Pausar';
+        btnPause.onclick = async () => {
+          try {
+            const response = await fetch(withCamera(URLS.pause), { method: 'POST' });
+            if (!response.ok) throw new Error('Erro ao pausar');
+            console.log('Contagem pausada');
+          } catch (error) {
+            alert('Erro ao pausar: ' + error.message);
+          }
+        };
+      }
+    }
+  }
+
+  function stopStatusUpdates() {
+    if (window.statusSource) {
+      window.statusSource.close();
+      window.statusSource = null;
+    }
     if (window.statusInterval) {
       clearInterval(window.statusInterval);
+      window.statusInterval = null;
+    }
+  }
+
+  function startStatusPolling() {
+    const URLS = window.VIDEO_AO_VIVO_URLS || {};
+    
+    // Limpar polling anterior se existir
+    stopStatusUpdates();
+    
+    // Push via SSE quando disponível; polling só como fallback
+    if (URLS.live_events && window.EventSource) {
+      const source = new EventSource(withCamera(URLS.live_events));
+      source.addEventListener('status', (e) => applyStatus(JSON.parse(e.data)));
+      source.onerror = () => {
+        // EventSource reconecta sozinho; se desistiu (CLOSED), volta ao polling
+        if (source.readyState === EventSource.CLOSED && window.statusSource === source) {
+          console.warn('SSE indisponível, usando polling');
+          window.statusSource = null;
+          startPollingFallback();
+        }
+      };
+      window.statusSource = source;
+      return;
     }
+    startPollingFallback();
+  }
+
+  function startPollingFallback() {
+    const URLS = window.VIDEO_AO_VIVO_URLS || {};
     
     window.statusInterval = setInterval(async () => {
       try {
         if (URLS.status) {
-          const response = await fetch(URLS.status);
-          const data = await response.json();
-          
-          const countInEl = document.getElementById('countIn');
-          const countOutEl = document.getElementById('countOut');
-          const countBalanceEl = document.getElementById('countBalance');
-          
-          if (countInEl) countInEl.textContent = data.in || 0;
-          if (countOutEl) countOutEl.textContent = data.out || 0;
-          if (countBalanceEl) countBalanceEl.textContent = (data.in || 0) - (data.out || 0);
-          
-          // Atualizar botão pause/resume
-          if (btnPause) {
-            if (data.paused) {
-              btnPause.textContent = '▶ Retomar';
-              btnPause.onclick = async () => {
-                try {
-                  const response = await fetch(URLS.resume, { method: 'POST' });
-                  if (!response.ok) throw new Error('Erro ao retomar');
-                  console.log('Contagem retomada');
-                } catch (error) {
-                  alert('Erro ao retomar: ' + error.message);
-                }
-              };
-            } else {
-              btnPause.textContent = '⏸ Pausar';
-              btnPause.onclick = async () => {
-                try {
-                  const response = await fetch(URLS.pause, { method: 'POST' });
-                  if (!response.ok) throw new Error('Erro ao pausar');
-                  console.log('Contagem pausada');
-                } catch (error) {
-                  alert('Erro ao pausar: ' + error.message);
-                }
-              };
-            }
-          }
+          const response = await fetch(withCamera(URLS.status));
+          applyStatus(await response.json());
         }
       } catch (e) {
         console.error('Erro no polling:', e);
@@ -343,7 +405,7 @@
     btnPause.addEventListener('click', async () => {
       try {
         const URLS = window.VIDEO_AO_VIVO_URLS || {};
-        const response = await fetch(URLS.pause, { method: 'POST' });
+        const response = await fetch(withCamera(URLS.pause), { method: 'POST' });
         const data = await response.json();
         
         if (!response.ok) {
@@ -396,7 +458,7 @@
         };
 
         const URLS = window.VIDEO_AO_VIVO_URLS || {};
-        const response = await fetch(URLS.stop, {
+        const response = await fetch(withCamera(URLS.stop), {
           method: 'POST',
           headers: {
             'Content-Type': 'application/json',
@@ -414,16 +476,13 @@
         // Fechar modal
         bootstrap.Modal.getInstance(document.getElementById('countingInfoModal')).hide();
         
-        // Parar polling
-        if (window.statusInterval) {
-          clearInterval(window.statusInterval);
-          window.statusInterval = null;
-        }
+        // Parar atualizações (SSE/polling)
+        stopStatusUpdates();
         
         // Parar stream
         const liveStreamEl = document.getElementById('liveStream');
         if (liveStreamEl) {
-          liveStreamEl.src = '';
+          stopLiveStream(liveStreamEl);
         }
         
         // Voltar para seleção
@@ -463,7 +522,7 @@
     if (countingActive && countingActive.style.display !== 'none' && URLS.stop) {
       // Tentar parar a contagem antes de sair
       try {
-        await fetch(URLS.stop, { method: 'POST' });
+        await fetch(withCamera(URLS.stop), { method: 'POST' });
       } catch (error) {
         console.error('Erro ao parar contagem:', error);
       }
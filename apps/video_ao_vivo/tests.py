@@ -1,3 +1,312 @@
-from django.test import TestCase
+from datetime import date, datetime, timedelta, timezone as dt_timezone
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+
+from apps.cameras.models import Camera
+
+from . import timebuckets
+from .models import CountingRollup
+from .services.contador.counting import CrossingCounter, ZoneCounter
+from .services.contador.events import EventRing
+from .services.contador.rollups import LiveRollup
+
+
+class LiveRollupTests(SimpleTestCase):
+    # 10:00:30 UTC de um dia qualquer, no meio de um minuto
+    NOW = 1_700_000_430.0
+
+    def test_out_event_counts_positive(self):
+        rollup = LiveRollup()
+        rollup.add(self.NOW, "IN", 1, "pig")
+        rollup.add(self.NOW, "OUT", -1, "pig")
+        rollup.add(self.NOW, "OUT", -1, "pig")
+
+        last = rollup.series("minute", 1, now=self.NOW)[-1]
+        self.assertEqual(last["in"], 1)
+        self.assertEqual(last["out"], 2)
+        # volume de movimento (como o gráfico calcula), não saldo
+        self.assertEqual(last["in"] + last["out"], 3)
+
+    def test_series_zero_fills_and_orders_windows(self):
+        rollup = LiveRollup()
+        rollup.add(self.NOW - 120, "IN", 1, "pig")
+        rollup.add(self.NOW, "OUT", -1, "cow")
+
+        series = rollup.series("minute", 3, now=self.NOW)
+        self.assertEqual([b["in"] for b in series], [1, 0, 0])
+        self.assertEqual([b["out"] for b in series], [0, 0, 1])
+        self.assertEqual(series[1]["start"] - series[0]["start"], 60)
+
+    def test_class_filter_and_hour_buckets(self):
+        rollup = LiveRollup()
+        rollup.add(self.NOW, "IN", 1, "pig")
+        rollup.add(self.NOW, "IN", 1, "cow")
+
+        self.assertEqual(rollup.series("minute", 1, now=self.NOW, class_name="pig")[-1]["in"], 1)
+        self.assertEqual(rollup.series("hour", 1, now=self.NOW)[-1]["in"], 2)
+
+    def test_zone_events_are_ignored(self):
+        rollup = LiveRollup()
+        rollup.add(self.NOW, "ENTER", 1, "pig")
+        self.assertEqual(rollup.series("minute", 1, now=self.NOW)[-1], {
+            "start": int(self.NOW // 60) * 60, "in": 0, "out": 0,
+        })
+
+    def test_old_windows_are_dropped(self):
+        rollup = LiveRollup(minutes=2)
+        for k in range(5):
+            rollup.add(self.NOW - 60 * (4 - k), "IN", 1)
+        self.assertEqual(len(rollup.minute._buckets), 2)
+        self.assertEqual([b["in"] for b in rollup.series("minute", 5, now=self.NOW)], [0, 0, 0, 1, 1])
+
+
+class CrossingCounterTests(SimpleTestCase):
+    # linha horizontal em y=100, desenhada da esquerda para a direita
+    LINE = [(0, 100), (200, 100)]
+
+    def run_track(self, counter, ys, start_frame=0, track_id=1):
+        """Passa um track por ys (um frame cada); retorna (total_in, total_out)."""
+        total_in = total_out = 0
+        for i, y in enumerate(ys):
+            ids_in, ids_out = counter.update([track_id], [(50, y)], self.LINE, start_frame + i)
+            total_in += len(ids_in)
+            total_out += len(ids_out)
+        return total_in, total_out
+
+    def test_top_to_bottom_is_out(self):
+        self.assertEqual(self.run_track(CrossingCounter(), [80, 90, 110, 120]), (0, 1))
+
+    def test_bottom_to_top_is_in(self):
+        self.assertEqual(self.run_track(CrossingCounter(), [120, 110, 90, 80]), (1, 0))
+
+    def test_first_detection_does_not_count(self):
+        counter = CrossingCounter()
+        # primeiro frame já abaixo da linha: sem posição anterior, sem cruzamento
+        self.assertEqual(self.run_track(counter, [120, 125]), (0, 0))
+
+    def test_jitter_on_the_line_counts_once(self):
+        counter = CrossingCounter(cooldown_frames=20)
+        ys = [90, 101, 99, 102, 98, 103, 110]
+        self.assertEqual(self.run_track(counter, ys), (0, 1))
+
+    def test_crossing_back_after_cooldown_counts_again(self):
+        counter = CrossingCounter(cooldown_frames=5)
+        self.assertEqual(self.run_track(counter, [90, 110]), (0, 1))
+        self.assertEqual(self.run_track(counter, [110, 90], start_frame=10), (1, 0))
+
+    def test_tracks_are_independent(self):
+        counter = CrossingCounter()
+        counter.update([1, 2], [(50, 90), (60, 110)], self.LINE, 0)
+        ids_in, ids_out = counter.update([1, 2], [(50, 110), (60, 90)], self.LINE, 1)
+        self.assertEqual(ids_out.tolist(), [1])
+        self.assertEqual(ids_in.tolist(), [2])
+
+    def test_moving_alongside_the_line_does_not_count(self):
+        counter = CrossingCounter()
+        counter.update([1], [(250, 90)], self.LINE, 0)
+        # cruza a reta fora do segmento (x > 200)
+        ids_in, ids_out = counter.update([1], [(250, 110)], self.LINE, 1)
+        self.assertEqual((len(ids_in), len(ids_out)), (0, 0))
+
+
+class ZoneCounterTests(SimpleTestCase):
+    ZONE = [(0, 0), (100, 0), (100, 100), (0, 100)]
+
+    def test_enter_and_exit(self):
+        counter = ZoneCounter()
+        counter.update([1], [(150, 50)], self.ZONE, 0)
+        enter, exit_ = counter.update([1], [(50, 50)], self.ZONE, 1)
+        self.assertEqual((enter.tolist(), exit_.tolist()), ([1], []))
+        self.assertEqual(counter.occupancy, 1)
+        enter, exit_ = counter.update([1], [(150, 50)], self.ZONE, 2)
+        self.assertEqual((enter.tolist(), exit_.tolist()), ([], [1]))
+        self.assertEqual(counter.occupancy, 0)
+
+    def test_staying_inside_counts_once(self):
+        counter = ZoneCounter()
+        counter.update([1], [(150, 50)], self.ZONE, 0)
+        entered = 0
+        for frame, x in enumerate([50, 55, 60, 52], start=1):
+            enter, _ = counter.update([1], [(x, 50)], self.ZONE, frame)
+            entered += len(enter)
+        self.assertEqual(entered, 1)
+
+    def test_first_seen_inside_is_occupancy_not_enter(self):
+        counter = ZoneCounter()
+        enter, exit_ = counter.update([1, 2], [(50, 50), (150, 50)], self.ZONE, 0)
+        self.assertEqual((len(enter), len(exit_)), (0, 0))
+        self.assertEqual(counter.occupancy, 1)
+
+    def test_empty_frame_keeps_occupancy(self):
+        # gate de movimento ocioso manda frames sem detecção: animais parados continuam na zona
+        counter = ZoneCounter()
+        counter.update([1, 2], [(50, 50), (60, 60)], self.ZONE, 0)
+        enter, exit_ = counter.update([], [], self.ZONE, 1)
+        self.assertEqual((len(enter), len(exit_)), (0, 0))
+        self.assertEqual(counter.occupancy, 2)
+        # quando voltam a ser detectados não há saída nem entrada falsa
+        enter, exit_ = counter.update([1, 2], [(50, 50), (60, 60)], self.ZONE, 2)
+        self.assertEqual((len(enter), len(exit_)), (0, 0))
+        self.assertEqual(counter.occupancy, 2)
+
+
+class EventRingTests(SimpleTestCase):
+    def make_ring(self, capacity, n):
+        ring = EventRing(capacity)
+        for event_id in range(1, n + 1):
+            ring.append({"id": event_id})
+        return ring
+
+    @staticmethod
+    def ids(events):
+        return [e["id"] for e in events]
+
+    def test_keeps_only_last_capacity_events(self):
+        ring = self.make_ring(5, 8)
+        self.assertEqual(len(ring), 5)
+        self.assertEqual(ring.last_id, 8)
+        self.assertEqual(ring.evicted_upto, 3)
+        events, _ = ring.after(0)
+        self.assertEqual(self.ids(events), [4, 5, 6, 7, 8])
+
+    def test_after_across_compaction(self):
+        # 12 eventos com capacidade 5: o buffer já foi compactado
+        ring = self.make_ring(5, 12)
+        self.assertEqual(len(ring), 5)
+        events, gap = ring.after(9)
+        self.assertEqual(self.ids(events), [10, 11, 12])
+        self.assertFalse(gap)
+        events, gap = ring.after(8, limit=2)
+        self.assertEqual(self.ids(events), [9, 10])
+        self.assertFalse(gap)
+        events, gap = ring.after(12)
+        self.assertEqual(events, [])
+        self.assertFalse(gap)
+
+    def test_gap_only_for_evicted_ids(self):
+        ring = self.make_ring(5, 12)  # 1..7 descartados
+        events, gap = ring.after(6)
+        self.assertEqual(self.ids(events), [8, 9, 10, 11, 12])
+        self.assertTrue(gap)
+        # id 7 foi descartado, mas nada depois dele se perdeu
+        events, gap = ring.after(7)
+        self.assertEqual(self.ids(events), [8, 9, 10, 11, 12])
+        self.assertFalse(gap)
+
+    def test_no_gap_before_eviction(self):
+        ring = self.make_ring(5, 3)
+        events, gap = ring.after(0)
+        self.assertEqual(self.ids(events), [1, 2, 3])
+        self.assertFalse(gap)
+
+    def test_wait_after_returns_immediately_with_pending_events(self):
+        ring = self.make_ring(5, 3)
+        events, gap = ring.wait_after(1, timeout=5)
+        self.assertEqual(self.ids(events), [2, 3])
+        self.assertFalse(gap)
+
+
+def _utc(*args):
+    return datetime(*args, tzinfo=dt_timezone.utc)
+
+
+class ParseRangeTests(SimpleTestCase):
+    # TIME_ZONE = "UTC": o fuso local coincide com UTC nos asserts
+
+    def test_presets(self):
+        start, end, granularity = timebuckets.parse_range("24h")
+        self.assertEqual(granularity, timebuckets.HOUR)
+        self.assertEqual(end - start, timedelta(hours=24))
+        start, end, granularity = timebuckets.parse_range("7d")
+        self.assertEqual(granularity, timebuckets.DAY)
+        self.assertEqual(end - start, timedelta(days=7))
+
+    def test_custom_date_only_end_includes_whole_day(self):
+        start, end, granularity = timebuckets.parse_range("custom", "2024-03-01", "2024-03-01")
+        self.assertEqual(start, _utc(2024, 3, 1))
+        self.assertEqual(end, _utc(2024, 3, 2))
+        self.assertEqual(granularity, timebuckets.HOUR)
+
+    def test_custom_datetime_end_is_kept(self):
+        start, end, granularity = timebuckets.parse_range(
+            "custom", "2024-03-01T10:30:00", "2024-03-01T15:00:00"
+        )
+        self.assertEqual(start, _utc(2024, 3, 1, 10))  # início da janela de hora
+        self.assertEqual(end, _utc(2024, 3, 1, 15))
+        self.assertEqual(granularity, timebuckets.HOUR)
+
+    def test_granularity_switches_to_day_above_two_days(self):
+        *_, granularity = timebuckets.parse_range("custom", "2024-03-01", "2024-03-02")
+        self.assertEqual(granularity, timebuckets.HOUR)
+        start, end, granularity = timebuckets.parse_range("custom", "2024-03-01T06:00:00", "2024-03-03")
+        self.assertEqual(granularity, timebuckets.DAY)
+        self.assertEqual(start, _utc(2024, 3, 1))
+        self.assertEqual(end, _utc(2024, 3, 4))
+
+    def test_end_not_after_start_is_rejected(self):
+        with self.assertRaises(ValueError):
+            timebuckets.parse_range("custom", "2024-03-02", "2024-03-01")
+        with self.assertRaises(ValueError):
+            timebuckets.parse_range("custom", "2024-03-01T10:00:00", "2024-03-01T10:00:00")
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            timebuckets.parse_range("1y")
+        with self.assertRaises(ValueError):
+            timebuckets.parse_range("custom", "2024-03-01")
+        with self.assertRaises(ValueError):
+            timebuckets.parse_range("custom", "2024-03-01", "ontem")
+
+
+class BucketTotalsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user("teste@example.com", "senha")
+        cls.camera = Camera.objects.create(user=cls.user, name="Baia 1")
+
+    def add_rollup(self, granularity, bucket, total_in=0, total_out=0, sessions=1):
+        CountingRollup.objects.create(
+            granularity=granularity, bucket=bucket, user=self.user, camera=self.camera,
+            sessions=sessions, total_in=total_in, total_out=total_out,
+        )
+
+    def test_day_series_is_zero_filled(self):
+        self.add_rollup(CountingRollup.DAY, _utc(2024, 3, 1), total_in=5, total_out=2)
+        self.add_rollup(CountingRollup.DAY, _utc(2024, 3, 3), total_in=7)
+        self.add_rollup(CountingRollup.DAY, _utc(2024, 3, 4), total_in=100)  # fora do intervalo
+
+        start, end, granularity = timebuckets.parse_range("custom", "2024-03-01", "2024-03-03")
+        series = timebuckets.rollup_totals(start, end, granularity, user=self.user)
+
+        self.assertEqual([row["period"] for row in series],
+                         [date(2024, 3, 1), date(2024, 3, 2), date(2024, 3, 3)])
+        self.assertEqual([row["in_count"] for row in series], [5, 0, 7])
+        self.assertEqual([row["out_count"] for row in series], [2, 0, 0])
+        self.assertEqual([row["session_count"] for row in series], [1, 0, 1])
+
+    def test_hour_series_uses_hour_rollups(self):
+        self.add_rollup(CountingRollup.HOUR, _utc(2024, 3, 1, 10), total_in=3)
+        self.add_rollup(CountingRollup.DAY, _utc(2024, 3, 1), total_in=50)  # outra granularidade
+
+        start, end, granularity = timebuckets.parse_range("custom", "2024-03-01", "2024-03-01")
+        series = timebuckets.rollup_totals(start, end, granularity, user=self.user)
+
+        self.assertEqual(len(series), 24)
+        self.assertEqual(series[0]["period"], _utc(2024, 3, 1))
+        self.assertEqual(series[10], {"period": _utc(2024, 3, 1, 10), "in_count": 3,
+                                      "out_count": 0, "session_count": 1})
+        self.assertEqual(sum(row["in_count"] for row in series), 3)
+
+    def test_sums_rows_in_the_same_bucket(self):
+        other = Camera.objects.create(user=self.user, name="Baia 2")
+        self.add_rollup(CountingRollup.HOUR, _utc(2024, 3, 1, 10), total_in=3)
+        CountingRollup.objects.create(
+            granularity=CountingRollup.HOUR, bucket=_utc(2024, 3, 1, 10), user=self.user,
+            camera=other, sessions=2, total_in=4,
+        )
+        series = timebuckets.rollup_totals(
+            _utc(2024, 3, 1, 9), _utc(2024, 3, 1, 12), timebuckets.HOUR, user=self.user
+        )
+        self.assertEqual([row["in_count"] for row in series], [0, 7, 0])
+        self.assertEqual([row["session_count"] for row in series], [0, 3, 0])
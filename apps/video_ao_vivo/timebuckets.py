@@ -0,0 +1,121 @@
+"""
+Agrupamento por hora/dia para os gráficos dos painéis.
+
+Cada série é um único GROUP BY (TruncHour/TruncDate no fuso configurado em
+TIME_ZONE); as janelas sem dados são preenchidas com zero aqui, em Python.
+"""
+from datetime import datetime, time, timedelta
+
+from django.db.models import Sum
+from django.db.models.functions import TruncDate, TruncHour
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+HOUR = "hour"
+DAY = "day"
+
+# Intervalos prontos: nome -> (número de janelas, granularidade)
+RANGES = {
+    "24h": (24, HOUR),
+    "7d": (7, DAY),
+    "30d": (30, DAY),
+}
+
+
+def _step(granularity: str) -> timedelta:
+    return timedelta(hours=1) if granularity == HOUR else timedelta(days=1)
+
+
+def floor_bucket(dt, granularity: str):
+    """Início (no fuso local) da janela que contém dt."""
+    local = timezone.localtime(dt)
+    if granularity == HOUR:
+        return local.replace(minute=0, second=0, microsecond=0)
+    return local.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def last_buckets(n: int, granularity: str, now=None):
+    """(início, fim exclusivo) das últimas n janelas, incluindo a atual."""
+    current = floor_bucket(now or timezone.now(), granularity)
+    return current - (n - 1) * _step(granularity), current + _step(granularity)
+
+
+def _parse_bound(value: str, end: bool = False):
+    # data antes de datetime: parse_datetime também aceita "YYYY-MM-DD" (meia-noite)
+    day = parse_date(value)
+    if day is not None:
+        # data sem hora: o fim inclui o dia inteiro
+        dt = datetime.combine(day + timedelta(days=1) if end else day, time.min)
+    else:
+        dt = parse_datetime(value)
+        if dt is None:
+            raise ValueError(f"Data inválida: {value}")
+    if timezone.is_naive(dt):
+        dt = timezone.make_aware(dt)
+    return dt
+
+
+def parse_range(name: str = "7d", start: str = None, end: str = None):
+    """
+    Resolve um intervalo para (início, fim exclusivo, granularidade).
+
+    name é "24h", "7d", "30d" ou "custom"; no custom, start/end são datas
+    (YYYY-MM-DD) ou datetimes ISO e a granularidade é hora até 2 dias e dia
+    acima disso.
+    """
+    if name in RANGES:
+        n, granularity = RANGES[name]
+        return (*last_buckets(n, granularity), granularity)
+    if name != "custom":
+        raise ValueError(f"Intervalo desconhecido: {name}")
+    if not start or not end:
+        raise ValueError("Intervalo custom exige start e end")
+    start_dt, end_dt = _parse_bound(start), _parse_bound(end, end=True)
+    if end_dt <= start_dt:
+        raise ValueError("end deve ser posterior a start")
+    granularity = HOUR if end_dt - start_dt <= timedelta(days=2) else DAY
+    return floor_bucket(start_dt, granularity), end_dt, granularity
+
+
+def bucket_totals(queryset, field: str, start, end, granularity: str, **sums):
+    """
+    Agrega queryset por janela de `field` entre start e end (exclusivo).
+
+    sums são as agregações (ex: in_count=Sum("total_in")). Retorna uma
+    lista em ordem cronológica, com uma entrada por janela:
+    {"period": datetime (hora) ou date (dia), <nome>: valor ou 0, ...}.
+    """
+    trunc = TruncHour(field) if granularity == HOUR else TruncDate(field)
+    rows = (
+        queryset.filter(**{f"{field}__gte": start, f"{field}__lt": end})
+        .annotate(period=trunc)
+        .values("period")
+        .annotate(**sums)
+        .order_by()
+    )
+    by_period = {row["period"]: row for row in rows}
+
+    series = []
+    period = floor_bucket(start, granularity)
+    while period < end:
+        key = period if granularity == HOUR else period.date()
+        row = by_period.get(key, {})
+        series.append({"period": key, **{name: row.get(name) or 0 for name in sums}})
+        period += _step(granularity)
+    return series
+
+
+def rollup_totals(start, end, granularity: str, **filters):
+    """Série de sessões/entradas/saídas a partir de CountingRollup (filters: user, camera, ...)."""
+    from apps.video_ao_vivo.models import CountingRollup
+
+    rollups = CountingRollup.objects.filter(
+        granularity=CountingRollup.HOUR if granularity == HOUR else CountingRollup.DAY,
+        **filters,
+    )
+    return bucket_totals(
+        rollups, "bucket", start, end, granularity,
+        in_count=Sum("total_in"),
+        out_count=Sum("total_out"),
+        session_count=Sum("sessions"),
+    )
@@ -10,11 +10,25 @@ urlpatterns = [
     path("api/pause/", views.api_pause, name="pause"),
     path("api/resume/", views.api_resume, name="resume"),
     path("api/events/", views.api_events, name="events"),
+    path("api/live/", views.api_live, name="live_events"),
     path("api/stop/", views.api_stop, name="stop"),
     path("api/status/", views.api_status, name="status"),
     path("stream/", views.stream_mjpeg, name="stream"),
     path("api/meta/", views.api_video_meta, name="meta"),
     path("api/line/", views.api_set_line, name="line"),
+    path("api/regions/", views.api_set_regions, name="regions"),
     path("api/snapshot/", views.api_snapshot, name="snapshot"),
     path("api/chart-data/", views.api_chart_data, name="chart_data"),
+    # Rotas por câmera (vários contadores simultâneos)
+    path("api/cameras/status/", views.api_status_all, name="status_all"),
+    path("api/cameras/<int:camera_id>/start/", views.api_start, name="camera_start"),
+    path("api/cameras/<int:camera_id>/pause/", views.api_pause, name="camera_pause"),
+    path("api/cameras/<int:camera_id>/resume/", views.api_resume, name="camera_resume"),
+    path("api/cameras/<int:camera_id>/stop/", views.api_stop, name="camera_stop"),
+    path("api/cameras/<int:camera_id>/status/", views.api_status, name="camera_status"),
+    path("api/cameras/<int:camera_id>/events/", views.api_events, name="camera_events"),
+    path("api/cameras/<int:camera_id>/live/", views.api_live, name="camera_live_events"),
+    path("api/cameras/<int:camera_id>/line/", views.api_set_line, name="camera_line"),
+    path("api/cameras/<int:camera_id>/regions/", views.api_set_regions, name="camera_regions"),
+    path("cameras/<int:camera_id>/stream/", views.stream_mjpeg, name="camera_stream"),
 ]
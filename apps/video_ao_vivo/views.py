@@ -1,5 +1,7 @@
 import time
-from django.http import JsonResponse, StreamingHttpResponse
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ObjectDoesNotExist
+from django.http import HttpResponseNotAllowed, HttpResponseNotFound, JsonResponse, StreamingHttpResponse
 from django.shortcuts import render
 from django.views.decorators.http import require_http_methods
 from django.views.decorators.csrf import csrf_exempt
@@ -9,6 +11,83 @@ from django.contrib.staticfiles import finders
 from django.conf import settings
 
 
+def _camera_id_param(request, camera_id=None):
+    """camera_id da rota ou da query/form; None mantém o modo de câmera única."""
+    if camera_id is not None:
+        return int(camera_id)
+    value = request.GET.get('camera_id') or request.POST.get('camera_id')
+    return int(value) if value else None
+
+
+def _owned_camera_id(request, camera_id=None):
+    """
+    Câmera em que a requisição vai atuar, se for do usuário logado.
+
+    Sem camera_id vale a última câmera iniciada (rotas de câmera única).
+    Retorna None se não há câmera; levanta Camera.DoesNotExist se ela não
+    existe ou é de outro usuário. Consulta o banco: nas views async chamar
+    via sync_to_async.
+    """
+    from apps.cameras.models import Camera
+    from .services.contador.manager import counter_manager
+
+    camera_id = counter_manager.camera_id_for(_camera_id_param(request, camera_id))
+    if camera_id is None:
+        return None
+    if not request.user.is_authenticated or not Camera.objects.filter(pk=camera_id, user=request.user).exists():
+        raise Camera.DoesNotExist
+    return camera_id
+
+
+def _owned_camera_ids(request):
+    """Ids das câmeras do usuário logado (consulta o banco)."""
+    from apps.cameras.models import Camera
+
+    if not request.user.is_authenticated:
+        return set()
+    return set(Camera.objects.filter(user=request.user).values_list("id", flat=True))
+
+
+def _camera_not_found():
+    return JsonResponse({"ok": False, "error": "Câmera não encontrada"}, status=404)
+
+
+# Views assíncronas (servidas via ASGI/uvicorn): viewers e polling ocupam só
+# corrotinas, e o trabalho lento (carregar modelo, finalizar sessão, consultas
+# dos gráficos) roda em thread via _offload, sem segurar a thread das views
+# síncronas do worker.
+
+def _async_csrf_exempt(view):
+    """csrf_exempt do Django 4.2 embrulha a view numa função síncrona; nas async basta a marca."""
+    view.csrf_exempt = True
+    return view
+
+
+def _offload(func):
+    """
+    func numa thread do pool (thread_sensitive=False).
+
+    O Django não fecha conexões abertas nessas threads, então a conexão com
+    o banco usada por func é fechada ao final.
+    """
+    def run(*args, **kwargs):
+        from django.db import connection
+        try:
+            return func(*args, **kwargs)
+        finally:
+            connection.close()
+    return sync_to_async(run, thread_sensitive=False)
+
+
+async def _request_user(request):
+    """request.user já carregado (no Django 4.2 não há request.auser())."""
+    def load():
+        user = request.user
+        user.is_authenticated  # força a consulta da sessão/usuário
+        return user
+    return await sync_to_async(load)()
+
+
 def live_page(request):
     from apps.cameras.models import Camera
     cameras = Camera.objects.filter(is_active=True, user=request.user)
@@ -19,45 +98,56 @@ def live_page(request):
         .values_list('detection_class_name', flat=True)
         .distinct()
     )
-    return render(request, "video_ao_vivo/index.html", {"cameras": cameras, "animal_types": animal_types})
+    return render(request, "video_ao_vivo/index.html", {
+        "cameras": cameras,
+        "animal_types": animal_types,
+        "stream_max_s": settings.COUNTER_STREAM_MAX_S,
+    })
 
 
-@csrf_exempt
-@require_http_methods(["POST", "GET"])
-def api_start(request):
-    camera_id = request.GET.get('camera_id') or request.POST.get('camera_id')
+def _start_counter(camera, user):
+    """Carrega o modelo e inicia o contador (lento: roda via _offload). Retorna (iniciou, device)."""
+    # Importar aqui para evitar problemas de import circular
+    from .services.contador.manager import counter_manager
+    from .services.contador.config import CounterConfig
+    
+    # Detecta GPU/CPU
+    import torch
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    
+    # Criar config básico (modelo será definido pelo manager)
+    config = CounterConfig(
+        model_path="",  # Será sobrescrito
+        conf_thres=0.25,
+        resize_scale=1.0,
+        device=device,
+        line_y_norm=0.5  # Valor padrão, será atualizado pelo set_line
+    )
+    return counter_manager.start(camera, user, config), device
+
+
+@_async_csrf_exempt
+async def api_start(request, camera_id=None):
+    # require_http_methods não suporta views async no Django 4.2
+    if request.method not in ("POST", "GET"):
+        return HttpResponseNotAllowed(["POST", "GET"])
+    camera_id = camera_id or request.GET.get('camera_id') or request.POST.get('camera_id')
     
     if not camera_id:
         return JsonResponse({"ok": False, "error": "camera_id é obrigatório"}, status=400)
     
+    user = await _request_user(request)
     try:
         from apps.cameras.models import Camera
-        camera = Camera.objects.get(id=camera_id, is_active=True, user=request.user)
+        camera = await sync_to_async(Camera.objects.get)(id=camera_id, is_active=True, user=user)
     except Camera.DoesNotExist:
         return JsonResponse({"ok": False, "error": "Câmera não encontrada"}, status=404)
     
     if not camera.primary_url:
         return JsonResponse({"ok": False, "error": "Câmera sem URL configurada"}, status=400)
     
-    # Importar aqui para evitar problemas de import circular
     try:
-        from .services.contador.manager import counter_manager
-        from .services.contador.config import CounterConfig
-        
-        # Detecta GPU/CPU
-        import torch
-        device = "cuda" if torch.cuda.is_available() else "cpu"
-        
-        # Criar config básico (modelo será definido pelo manager)
-        config = CounterConfig(
-            model_path="",  # Será sobrescrito
-            conf_thres=0.25,
-            resize_scale=1.0,
-            device=device,
-            line_y_norm=0.5  # Valor padrão, será atualizado pelo set_line
-        )
-        
-        counter_manager.start(camera, request.user, config)
+        started, device = await _offload(_start_counter)(camera, user)
         
         return JsonResponse({
             "ok": True,
@@ -65,7 +155,8 @@ def api_start(request):
             "camera_name": camera.name,
             "camera_url": camera.primary_url,
             "device": device,
-            "message": "Contador iniciado com sucesso"
+            "already_running": not started,
+            "message": "Contador iniciado com sucesso" if started else "Contador já estava em execução"
         })
         
     except Exception as e:
@@ -74,96 +165,131 @@ def api_start(request):
 
 @csrf_exempt
 @require_http_methods(["POST", "GET"])
-def api_pause(request):
+def api_pause(request, camera_id=None):
     try:
         from .services.contador.manager import counter_manager
-        counter_manager.pause()
+        counter_manager.pause(_owned_camera_id(request, camera_id))
         return JsonResponse({"ok": True, "message": "Contagem pausada"})
+    except ObjectDoesNotExist:
+        return _camera_not_found()
     except Exception as e:
         return JsonResponse({"ok": False, "error": str(e)}, status=500)
 
 
 @csrf_exempt
 @require_http_methods(["POST", "GET"])
-def api_resume(request):
+def api_resume(request, camera_id=None):
     try:
         from .services.contador.manager import counter_manager
-        counter_manager.resume()
+        counter_manager.resume(_owned_camera_id(request, camera_id))
         return JsonResponse({"ok": True, "message": "Contagem retomada"})
+    except ObjectDoesNotExist:
+        return _camera_not_found()
     except Exception as e:
         return JsonResponse({"ok": False, "error": str(e)}, status=500)
 
 
-@csrf_exempt
-@require_http_methods(["POST", "GET"])
-def api_stop(request):
+@_async_csrf_exempt
+async def api_stop(request, camera_id=None):
+    if request.method not in ("POST", "GET"):
+        return HttpResponseNotAllowed(["POST", "GET"])
     try:
         import json
-        from .models import CountingSession
         from .services.contador.manager import counter_manager
         
-        counter_manager.stop()
-        
-        # Se for POST com dados JSON, salvar informações adicionais
+        # Se for POST com dados JSON, informações adicionais da sessão
+        session_info = None
         if request.method == 'POST' and request.content_type == 'application/json':
             try:
                 data = json.loads(request.body)
-                
-                # Obter a sessão de contagem ativa
-                # A sessão é criada quando o contador inicia
-                # Procurar pela sessão mais recente sem ended_at
-                session = CountingSession.objects.filter(ended_at__isnull=True).order_by('-started_at').first()
-                
-                if session:
-                    # Atualizar com as informações adicionais
-                    session.animal_type = data.get('animal_type')
-                    session.batch_number = data.get('batch_number')
-                    session.recipient = data.get('recipient')
-                    session.recipient = data.get('recipient')
-                    session.additional_notes = data.get('additional_notes')
-                    session.ended_at = timezone.now()
-                    session.save()
-                    
+                session_info = {field: data.get(field) for field in counter_manager.SESSION_INFO_FIELDS}
             except json.JSONDecodeError:
                 pass  # Se não for JSON válido, apenas continua
         
+        # Sessão finalizada pelo manager (a da câmera informada), já com as informações;
+        # para o processador e grava totais/rollups, então roda fora do loop
+        camera_id = await sync_to_async(_owned_camera_id)(request, camera_id)
+        await _offload(counter_manager.stop)(camera_id, session_info)
+        
         return JsonResponse({"ok": True, "message": "Contagem parada"})
+    except ObjectDoesNotExist:
+        return _camera_not_found()
     except Exception as e:
         return JsonResponse({"ok": False, "error": str(e)}, status=500)
 
 
-def api_status(request):
+# O manager usa lock de thread, então as chamadas rápidas a ele rodam em
+# thread via sync_to_async (thread_sensitive=False: não disputam a thread
+# única das views síncronas); nenhuma delas consulta o banco.
+
+def _manager_call(name):
+    from .services.contador.manager import counter_manager
+    return sync_to_async(getattr(counter_manager, name), thread_sensitive=False)
+
+
+async def api_status(request, camera_id=None):
     try:
-        from .services.contador.manager import counter_manager
-        return JsonResponse(counter_manager.status())
+        camera_id = await sync_to_async(_owned_camera_id)(request, camera_id)
+        status = await _manager_call("status")(camera_id)
+        return JsonResponse(status)
+    except ObjectDoesNotExist:
+        return _camera_not_found()
     except Exception as e:
         return JsonResponse({"ok": False, "error": str(e)}, status=500)
 
 
-def stream_mjpeg(request):
+async def api_status_all(request):
+    """Status de todos os contadores ativos"""
+    try:
+        owned = await sync_to_async(_owned_camera_ids)(request)
+        counters = [c for c in await _manager_call("status_all")() if c["camera_id"] in owned]
+        return JsonResponse({"ok": True, "counters": counters})
+    except Exception as e:
+        return JsonResponse({"ok": False, "error": str(e)}, status=500)
+
+
+async def stream_mjpeg(request, camera_id=None):
     """Stream MJPEG do contador ativo"""
-    def generate():
-        from .services.contador.manager import counter_manager
+    try:
+        camera_id = await sync_to_async(_owned_camera_id)(request, camera_id)
+    except ObjectDoesNotExist:
+        return HttpResponseNotFound("Câmera não encontrada")
+    hub = await _manager_call("get_hub")(camera_id)
+
+    async def generate():
+        from .services.contador.streaming import placeholder_chunk
         print("Stream MJPEG iniciado")
         
-        while True:
-            jpeg_data = counter_manager.get_latest_jpeg()
-            if jpeg_data:
-                yield (b'--frame\r\n'
-                       b'Content-Type: image/jpeg\r\n\r\n' + jpeg_data + b'\r\n')
-            else:
-                # Frame vazio se não houver dados
-                import cv2
-                import numpy as np
-                blank = np.zeros((480, 640, 3), dtype=np.uint8)
-                cv2.putText(blank, 'Contador nao iniciado', (150, 220), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
-                cv2.putText(blank, 'Inicie a contagem primeiro', (120, 260), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.8, (200, 200, 200), 2)
-                _, buffer = cv2.imencode('.jpg', blank)
-                yield (b'--frame\r\n'
-                       b'Content-Type: image/jpeg\r\n\r\n' + buffer.tobytes() + b'\r\n')
-            time.sleep(0.033)  # ~30 FPS
+        if hub is None:
+            # nenhuma câmera iniciada ainda
+            yield placeholder_chunk()
+            return
+        
+        # No Django 4.2 o generator não é cancelado quando o cliente desconecta:
+        # a conexão tem duração máxima (o JS reabre o stream antes disso) e
+        # termina se ficar só no placeholder, para o finally sempre rodar.
+        deadline = time.monotonic() + settings.COUNTER_STREAM_MAX_S
+        idle_since = None
+        
+        # enquanto houver viewer o processador anota e codifica o preview
+        await _manager_call("add_viewer")(camera_id)
+        try:
+            seq = -1
+            while time.monotonic() < deadline:
+                # acorda quando sai frame novo; sem preview reenvia o placeholder 1x/s
+                new_seq, chunk = await hub.wait_async(seq, timeout=1.0)
+                if chunk is None:
+                    idle_since = idle_since or time.monotonic()
+                    if time.monotonic() - idle_since > settings.COUNTER_STREAM_IDLE_S:
+                        break
+                    yield placeholder_chunk()
+                else:
+                    idle_since = None
+                    if new_seq != seq:
+                        yield chunk
+                seq = new_seq
+        finally:
+            await _manager_call("remove_viewer")(camera_id)
     
     return StreamingHttpResponse(generate(), content_type='multipart/x-mixed-replace; boundary=frame')
 
@@ -179,37 +305,167 @@ def api_snapshot(request):
 
 @csrf_exempt
 @require_http_methods(["POST"])
-def api_set_line(request):
+def api_set_line(request, camera_id=None):
     try:
         import json
         from .services.contador.manager import counter_manager
         
         payload = json.loads(request.body.decode("utf-8") or "{}")
-        y = float(payload.get("line_y_norm", 0.5))
+        if camera_id is None and payload.get("camera_id") is not None:
+            camera_id = payload.get("camera_id")
         
-        # clamp 0..1
-        y = max(0.0, min(1.0, y))
+        # linha livre: {"points": [[x,y], ...]} ou {"p1": [x,y], "p2": [x,y]} (normalizados)
+        points = payload.get("points")
+        if points is None and payload.get("p1") and payload.get("p2"):
+            points = [payload["p1"], payload["p2"]]
+        if points is not None:
+            try:
+                stored = counter_manager.set_line_points(points, _owned_camera_id(request, camera_id))
+            except (TypeError, ValueError) as e:
+                return JsonResponse({"ok": False, "error": f"Pontos inválidos: {e}"}, status=400)
+            # pontos como o contador usa (limitados a 0..1), não os enviados
+            return JsonResponse({"ok": True, "points": stored})
         
-        counter_manager.set_line_y_norm(y)
-        return JsonResponse({"ok": True, "line_y_norm": y})
+        y = float(payload.get("line_y_norm", 0.5))
+        
+        # manager limita a 0..1 e devolve a posição gravada
+        stored = counter_manager.set_line_y_norm(y, _owned_camera_id(request, camera_id))
+        return JsonResponse({"ok": True, "line_y_norm": stored})
+    except ObjectDoesNotExist:
+        return _camera_not_found()
     except Exception as e:
         return JsonResponse({"ok": False, "error": str(e)}, status=500)
 
 
-@require_http_methods(["GET"])
-def api_events(request):
+@csrf_exempt
+@require_http_methods(["POST"])
+def api_set_regions(request, camera_id=None):
+    """Linhas e zonas nomeadas: {"lines": [{"name", "points"}], "zones": [...]}"""
     try:
+        import json
         from .services.contador.manager import counter_manager
+        
+        payload = json.loads(request.body.decode("utf-8") or "{}")
+        if camera_id is None and payload.get("camera_id") is not None:
+            camera_id = payload.get("camera_id")
+        
+        try:
+            counter_manager.set_regions(
+                payload.get("lines"), payload.get("zones"), _owned_camera_id(request, camera_id)
+            )
+        except (AttributeError, TypeError, ValueError) as e:
+            return JsonResponse({"ok": False, "error": f"Regiões inválidas: {e}"}, status=400)
+        return JsonResponse({"ok": True})
+    except ObjectDoesNotExist:
+        return _camera_not_found()
+    except Exception as e:
+        return JsonResponse({"ok": False, "error": str(e)}, status=500)
+
+
+async def api_events(request, camera_id=None):
+    """
+    Eventos com id > after.
+
+    Com ?wait=N (segundos, até 30) faz long-poll: responde assim que houver
+    evento novo ou ao fim do prazo. gap=true indica que eventos depois de
+    `after` já saíram do buffer e o cliente perdeu parte deles.
+    """
+    # require_http_methods não suporta views async no Django 4.2
+    if request.method != "GET":
+        return HttpResponseNotAllowed(["GET"])
+    try:
         after = int(request.GET.get("after", "0"))
-        events = counter_manager.get_events_after(after)
-        return JsonResponse({"ok": True, "events": events})
+        wait = min(max(float(request.GET.get("wait", "0")), 0.0), 30.0)
+        ring = await _manager_call("get_event_ring")(
+            await sync_to_async(_owned_camera_id)(request, camera_id)
+        )
+        if ring is None:
+            return JsonResponse({"ok": True, "events": [], "gap": False, "last_id": 0})
+        if wait:
+            events, gap = await ring.wait_after_async(after, timeout=wait)
+        else:
+            events, gap = ring.after(after)
+        return JsonResponse({"ok": True, "events": events, "gap": gap, "last_id": ring.last_id})
+    except ObjectDoesNotExist:
+        return _camera_not_found()
     except Exception as e:
         return JsonResponse({"ok": False, "error": str(e)}, status=500)
 
 
-@require_http_methods(["GET"])
-def api_chart_data(request):
+async def api_live(request, camera_id=None):
+    """
+    Server-Sent Events com contadores e eventos em tempo real.
+
+    Cada evento IN/OUT vai como `event: count` com o id do evento do
+    manager; reconectando, o navegador manda Last-Event-ID e recebe só o que
+    perdeu. A cada mudança também vai um `event: status` com os contadores.
+    Se os eventos pedidos já saíram do buffer, antes vai um `event: gap`.
+    
+    A conexão dura no máximo COUNTER_STREAM_MAX_S (no Django 4.2 o generator
+    não é cancelado quando o cliente some); o EventSource reconecta sozinho
+    após `retry` ms, mandando Last-Event-ID, sem perder eventos.
+    """
+    import json
+    
+    if request.method != "GET":
+        return HttpResponseNotAllowed(["GET"])
+    try:
+        camera_id = await sync_to_async(_owned_camera_id)(request, camera_id)
+    except ObjectDoesNotExist:
+        # 404 encerra o EventSource (não reconecta)
+        return _camera_not_found()
+    try:
+        last_id = int(request.headers.get("Last-Event-ID") or request.GET.get("after") or 0)
+    except ValueError:
+        last_id = 0
+    notifier = await _manager_call("get_notifier")(camera_id)
+    ring = await _manager_call("get_event_ring")(camera_id)
+    get_status = _manager_call("status")
+
+    async def generate():
+        nonlocal last_id
+        yield b"retry: 1000\n\n"
+        if notifier is None:
+            yield b"event: status\ndata: " + json.dumps({"running": False, "in": 0, "out": 0}).encode() + b"\n\n"
+            return
+        
+        deadline = time.monotonic() + settings.COUNTER_STREAM_MAX_S
+        while True:
+            # lê o seq antes dos dados: mudança durante a leitura acorda de novo na hora
+            seq = notifier.seq
+            events, gap = ring.after(last_id)
+            if gap:
+                yield f"event: gap\ndata: {json.dumps({'after': last_id, 'evicted_upto': ring.evicted_upto})}\n\n".encode()
+            for event in events:
+                last_id = event["id"]
+                yield f"id: {event['id']}\nevent: count\ndata: {json.dumps(event)}\n\n".encode()
+            status = await get_status(camera_id)
+            yield f"event: status\ndata: {json.dumps(status)}\n\n".encode()
+            
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return  # cliente reconecta a partir do último id
+                if await notifier.wait_seq_async(seq, timeout=min(15.0, remaining)) != seq:
+                    break
+                # comentário SSE mantém a conexão viva em proxies
+                yield b": keepalive\n\n"
+
+    response = StreamingHttpResponse(generate(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+async def api_chart_data(request):
     """Dados para gráficos em tempo real"""
+    if request.method != "GET":
+        return HttpResponseNotAllowed(["GET"])
+    # várias consultas ao banco: rodam fora do loop
+    return await _offload(_chart_data)(request)
+
+
+def _chart_data(request):
     try:
         from datetime import datetime, timedelta
         from .models import CountingSession
@@ -228,73 +484,44 @@ def api_chart_data(request):
                 'total_out': s.total_out
             })
         
-        # Buscar dados dos últimos 7 dias (igual ao histórico)
-        from django.db.models import Sum
-        from django.utils import timezone
+        # Série do intervalo pedido (?range=24h|7d|30d|custom&start=&end=; padrão 7 dias,
+        # igual ao histórico) - uma consulta nos rollups
+        from .timebuckets import HOUR, parse_range, rollup_totals
         
-        daily_data = []
-        for i in range(7):
-            day = timezone.now().date() - timedelta(days=6-i)
-            
-            day_sessions = CountingSession.objects.filter(
-                started_at__date=day,
-                ended_at__isnull=False
-            )
-            
-            day_totals = day_sessions.aggregate(
-                in_count=Sum('total_in'),
-                out_count=Sum('total_out')
+        try:
+            start, end, granularity = parse_range(
+                request.GET.get('range', '7d'), request.GET.get('start'), request.GET.get('end')
             )
-            
-            daily_data.append({
-                'date': day.strftime('%d/%m'),
-                'weekday': day.strftime('%a'),
-                'in': day_totals['in_count'] or 0,
-                'out': day_totals['out_count'] or 0,
-                'balance': (day_totals['in_count'] or 0) - (day_totals['out_count'] or 0)
-            })
+        except ValueError as e:
+            return JsonResponse({"ok": False, "error": str(e)}, status=400)
+        series = rollup_totals(start, end, granularity)
         
-        # Converter para formato horário para compatibilidade
-        hourly_data = []
-        for day in daily_data:
-            hourly_data.append({
-                'hour': day['weekday'],
-                'in': day['in'],
-                'out': day['out']
-            })
+        # Formato "hourly_data" mantido para compatibilidade com os gráficos
+        if granularity == HOUR:
+            label = '%H:00'
+        else:
+            label = '%a' if len(series) <= 7 else '%d/%m'
+        hourly_data = [
+            {'hour': b['period'].strftime(label), 'in': b['in_count'], 'out': b['out_count']}
+            for b in series
+        ]
         
-        # Dados por minuto da sessão ativa
-        minute_data = [0] * 10
-        active_session = CountingSession.objects.filter(ended_at__isnull=True).first()
+        # Dados por minuto (últimos 10 minutos) - totais mantidos em memória pelo contador
+        from .services.contador.manager import counter_manager
         
-        if active_session and active_session.log_file_path:
-            import os
-            from django.conf import settings
-            
+        # ?camera_id= e ?class_name= filtram; sem eles soma todas as câmeras/classes
+        camera_id = _camera_id_param(request)
+        if camera_id is not None:
             try:
-                log_path = os.path.join(settings.MEDIA_ROOT, active_session.log_file_path)
-                if os.path.exists(log_path):
-                    with open(log_path, 'r') as f:
-                        log_data = json.load(f)
-                        events = log_data.get('events', [])
-                    
-                    now = datetime.now()
-                    for i in range(10):
-                        minute_start = now.replace(second=0, microsecond=0) - timedelta(minutes=i)
-                        minute_end = minute_start + timedelta(minutes=1)
-                        
-                        minute_count = 0
-                        for event in events:
-                            try:
-                                event_time = datetime.fromisoformat(event['timestamp'].replace('Z', '+00:00'))
-                                if minute_start <= event_time < minute_end:
-                                    minute_count += 1
-                            except:
-                                continue
-                        
-                        minute_data[9-i] = minute_count
-            except Exception as e:
-                print(f"Erro ao processar log: {e}")
+                camera_id = _owned_camera_id(request, camera_id)
+            except ObjectDoesNotExist:
+                return _camera_not_found()
+        minute_data = [
+            b['in'] + b['out']
+            for b in counter_manager.rollup_series(
+                'minute', 10, camera_id, request.GET.get('class_name') or None
+            )
+        ]
         
         # Se não há dados nas últimas 24h, manter zeros
         total_data = sum(h['in'] + h['out'] for h in hourly_data)
@@ -305,7 +532,7 @@ def api_chart_data(request):
             "minute_data": minute_data,
             "debug": {
                 "total_sessions": CountingSession.objects.count(),
-                "recent_sessions": recent_sessions.count(),
+                "recent_sessions": sum(b['session_count'] for b in series),
                 "active_sessions": CountingSession.objects.filter(ended_at__isnull=True).count(),
                 "sample_sessions": debug_sessions
             }
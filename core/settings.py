@@ -295,3 +295,41 @@ os.environ.setdefault('TORCH_NUM_THREADS', '1')
 
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
+
+# =====================================================
+# CONTADOR (inferência)
+# =====================================================
+
+# Lote máximo de frames (de câmeras diferentes) por forward pass
+COUNTER_INFERENCE_MAX_BATCH = int(os.getenv("COUNTER_INFERENCE_MAX_BATCH", "8"))
+# Tempo máximo que a engine espera para completar um lote
+COUNTER_INFERENCE_MAX_WAIT_MS = float(os.getenv("COUNTER_INFERENCE_MAX_WAIT_MS", "10"))
+# Orçamento de memória do cache de modelos carregados (LRU)
+COUNTER_MODEL_CACHE_MB = float(os.getenv("COUNTER_MODEL_CACHE_MB", "1024"))
+# Runtime padrão quando a câmera usa um modelo fora de ModelConfiguration
+# ("torch", "onnx" ou "openvino"; sem artefato exportado cai para "torch")
+COUNTER_INFERENCE_BACKEND = os.getenv("COUNTER_INFERENCE_BACKEND", "torch")
+# Formatos exportados automaticamente após o upload de um modelo (ex: "onnx,openvino");
+# desligado por padrão, e formatos sem as dependências instaladas são ignorados
+COUNTER_EXPORT_ON_UPLOAD = tuple(
+    fmt.strip() for fmt in os.getenv("COUNTER_EXPORT_ON_UPLOAD", "").split(",") if fmt.strip()
+)
+# Detector roda 1 a cada N frames; entre keyframes as caixas são extrapoladas
+# (perto da linha de contagem o detector volta a rodar em todo frame)
+COUNTER_DETECT_STRIDE = int(os.getenv("COUNTER_DETECT_STRIDE", "1"))
+# Altura da faixa em torno da linha enviada ao detector (fração do frame; 0 = frame inteiro)
+COUNTER_ROI_BAND = float(os.getenv("COUNTER_ROI_BAND", "0"))
+# Pula detector/tracker enquanto não há movimento na região de contagem
+COUNTER_MOTION_GATE = os.getenv("COUNTER_MOTION_GATE", "False").lower() == "true"
+# Fração de pixels (frame reduzido) que precisa mudar para contar como movimento
+COUNTER_MOTION_THRESHOLD = float(os.getenv("COUNTER_MOTION_THRESHOLD", "0.005"))
+# FPS do preview MJPEG (anotação + JPEG rodam só enquanto há alguém assistindo)
+COUNTER_PREVIEW_FPS = float(os.getenv("COUNTER_PREVIEW_FPS", "10"))
+# Duração máxima (s) de uma conexão de stream MJPEG/SSE; o cliente reconecta.
+# No Django 4.2 o generator async não é cancelado quando o cliente desconecta,
+# então é esse limite que libera o viewer de uma aba fechada.
+COUNTER_STREAM_MAX_S = float(os.getenv("COUNTER_STREAM_MAX_S", "300"))
+# Stream MJPEG termina após esse tempo (s) só com placeholder (contador parado)
+COUNTER_STREAM_IDLE_S = float(os.getenv("COUNTER_STREAM_IDLE_S", "30"))
+# Eventos mantidos em memória por câmera (clientes mais atrasados recebem gap=true)
+COUNTER_EVENT_BUFFER = int(os.getenv("COUNTER_EVENT_BUFFER", "5000"))